@@ -0,0 +1,85 @@
+"""
+Benchmark de la búsqueda de grúa en el evaluador del makespan.
+
+Compara la búsqueda lineal del par de grúas que rodea cada tarea (O(m)) con
+la búsqueda binaria (bisect, O(log m)) al crecer el número de grúas.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_crane_lookup
+"""
+import argparse
+import random
+import time
+from typing import List
+
+from src.evaluator import MakespanEvaluator
+from src.problem import Task, Crane, GCSP_Instance, get_equidistant_positions
+
+
+def build_instance(n_tasks: int, n_cranes: int, rng: random.Random) -> GCSP_Instance:
+    """Genera una instancia sintética con el mismo esquema que generate_dataset.py.
+
+    Args:
+        n_tasks: Número de tareas.
+        n_cranes: Número de grúas.
+        rng: Generador aleatorio (semilla fija para reproducibilidad).
+
+    Returns:
+        Instancia GCSP.
+    """
+    tasks = [Task(i, i, rng.randint(30, 180)) for i in range(1, n_tasks + 1)]
+    locs = get_equidistant_positions(n_tasks, n_cranes)
+    cranes = [Crane(k, locs[k - 1]) for k in range(1, n_cranes + 1)]
+    inst = GCSP_Instance(tasks, cranes)
+    inst.name = f"bench_{n_tasks}x{n_cranes}"
+    return inst
+
+
+def time_evaluations(evaluator: MakespanEvaluator, sequences: List[List[int]], repeats: int) -> float:
+    """Devuelve el mejor tiempo medio por evaluación (µs) de 'repeats' pasadas."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for seq in sequences:
+            evaluator.evaluate(seq)
+        best = min(best, time.perf_counter() - start)
+    return best / len(sequences) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark búsqueda lineal vs bisect de grúas")
+    parser.add_argument('--tasks', type=int, nargs='+', default=[70, 140])
+    parser.add_argument('--cranes', type=int, nargs='+', default=[3, 5, 10, 15, 20])
+    parser.add_argument('--sequences', type=int, default=300, help="Secuencias aleatorias por instancia")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+
+    print(f"{'n x m':<10} | {'linear (µs)':<12} | {'bisect (µs)':<12} | {'speedup':<8}")
+    print("-" * 52)
+    for n_tasks in args.tasks:
+        for n_cranes in args.cranes:
+            if n_cranes > n_tasks:
+                continue
+            inst = build_instance(n_tasks, n_cranes, rng)
+            ids = [t.id for t in inst.tasks]
+            sequences = []
+            for _ in range(args.sequences):
+                rng.shuffle(ids)
+                sequences.append(ids[:])
+
+            linear = MakespanEvaluator(inst, crane_lookup='linear')
+            binary = MakespanEvaluator(inst, crane_lookup='bisect')
+            # Ambas búsquedas deben dar exactamente el mismo makespan
+            assert all(linear.evaluate(q) == binary.evaluate(q) for q in sequences[:20])
+
+            t_linear = time_evaluations(linear, sequences, args.repeats)
+            t_bisect = time_evaluations(binary, sequences, args.repeats)
+            label = f"{n_tasks}x{n_cranes}"
+            print(f"{label:<10} | {t_linear:<12.1f} | {t_bisect:<12.1f} | {t_linear / t_bisect:<8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Suite de benchmarks con semillas fijas y umbral de regresión.
+
+Micro-benchmarks (por tamaño, sobre una instancia fija de instances/):
+    makespan.<size> : calculate_makespan sobre secuencias aleatorias (µs por evaluación)
+    grasp.<size>    : construct_grasp_solution (ms por construcción)
+    tabu.<size>     : una llamada a tabu_search desde una solución GRASP (s)
+Macro-benchmarks (tiempo hasta objetivo):
+    ttt.<instancia> : segundos hasta que arranques GRASP + VNS consecutivos
+                      (semillas seed, seed + 1, ...) alcanzan el makespan
+                      objetivo de MACRO_TARGETS.
+
+Cada benchmark se repite 'repeats' veces con la misma semilla y se guarda el
+mejor tiempo (menos ruido que la media). Junto al tiempo se guarda un
+'checksum' (suma de makespans o makespan final): con la misma semilla debe
+coincidir entre ejecuciones, de modo que un cambio en el evaluador que altere
+los resultados se detecta aunque sea más rápido.
+
+Los resultados se escriben en JSON. Con --baseline se comparan con una
+ejecución anterior: el proceso termina con código 1 si algún benchmark es más
+lento que la línea base en más de --threshold (fracción) o si su checksum
+cambia.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.suite --output benchmarks/baseline.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --threshold 0.10
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.algorithms import (calculate_makespan, construct_grasp_solution, tabu_search,
+                            variable_neighborhood_search, _run_restart)
+from src.evaluator import get_evaluator
+from src.grid_search import algorithm_kwargs
+from src.io_handler import load_instance_from_json
+
+# Instancia representativa de cada tamaño para los micro-benchmarks
+MICRO_INSTANCES = {
+    'small': 'small_10x3_1',
+    'medium': 'medium_18x3_1',
+    'large': 'large_50x4_1',
+}
+# Makespan objetivo de cada instancia del tramo macro. Elegidos para que las
+# semillas por defecto lo alcancen en 0.2-3 s, en uno o varios arranques.
+MACRO_TARGETS = {
+    'small_12x3_3': 426,
+    'medium_18x3_1': 652,
+    'medium_20x4_1': 546,
+    'large_30x3_1': 1200,
+    'large_40x4_1': 1113,
+}
+# Parámetros del VNS de main.py (max_iter = 6 * n * m lo añade algorithm_kwargs)
+VNS_CONFIG = {'alpha': 0.5, 'tenure': 8, 'candidates': 20, 'vns_loops': 10, 'init_strategy': 'grasp'}
+MACRO_BUDGET = 120 # Segundos máximos por instancia del tramo macro
+
+MAKESPAN_SEQUENCES = 2000
+GRASP_CONSTRUCTIONS = 50
+
+
+def load_instance(name: str):
+    return load_instance_from_json(os.path.join('instances', f"{name}.json"))
+
+
+def best_of(repeats: int, run: Callable[[], float]) -> Tuple[float, List[float], float]:
+    """Ejecuta 'run' 'repeats' veces; devuelve (mejor tiempo, todos los tiempos, checksum).
+
+    'run' devuelve el checksum de la pasada; si cambia entre pasadas con la
+    misma semilla, el benchmark no es reproducible y se aborta.
+    """
+    times, checksum = [], None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        value = run()
+        times.append(time.perf_counter() - start)
+        if checksum is not None and value != checksum:
+            raise RuntimeError(f"Resultado no reproducible: {checksum} != {value}")
+        checksum = value
+    return min(times), times, checksum
+
+
+def record(seconds: float, times: List[float], checksum: float, unit: str, scale: float, **extra) -> dict:
+    """Registro de un benchmark: 'value' es el mejor tiempo en 'unit' (menor es mejor)."""
+    return dict({'value': seconds * scale, 'unit': unit, 'runs': [t * scale for t in times],
+                 'checksum': checksum}, **extra)
+
+
+# =========================================================
+# MICRO-BENCHMARKS
+# =========================================================
+def bench_makespan(inst, seed: int, repeats: int) -> dict:
+    """calculate_makespan sobre MAKESPAN_SEQUENCES permutaciones aleatorias."""
+    rng = random.Random(seed)
+    ids = [t.id for t in inst.tasks]
+    sequences = []
+    for _ in range(MAKESPAN_SEQUENCES):
+        rng.shuffle(ids)
+        sequences.append(ids[:])
+    get_evaluator(inst) # Compilación del evaluador fuera de la medida
+
+    def run():
+        return sum(calculate_makespan(inst, seq) for seq in sequences)
+
+    best, times, checksum = best_of(repeats, run)
+    per_eval = best / len(sequences)
+    return record(per_eval, [t / len(sequences) for t in times], checksum, 'µs', 1e6,
+                  evals_per_sec=1 / per_eval)
+
+
+def bench_grasp(inst, seed: int, repeats: int) -> dict:
+    """GRASP_CONSTRUCTIONS construcciones GRASP con alpha 0.5."""
+    get_evaluator(inst)
+
+    def run():
+        random.seed(seed)
+        return sum(calculate_makespan(inst, construct_grasp_solution(inst, alpha=0.5))
+                   for _ in range(GRASP_CONSTRUCTIONS))
+
+    best, times, checksum = best_of(repeats, run)
+    return record(best / GRASP_CONSTRUCTIONS, [t / GRASP_CONSTRUCTIONS for t in times],
+                  checksum, 'ms', 1e3)
+
+
+def bench_tabu(inst, seed: int, repeats: int) -> dict:
+    """Una llamada a tabu_search (parámetros de main.py) desde una solución GRASP fija."""
+    random.seed(seed)
+    initial = construct_grasp_solution(inst, alpha=0.5)
+    kwargs = algorithm_kwargs(VNS_CONFIG, inst)
+
+    def run():
+        random.seed(seed)
+        _, makespan, _ = tabu_search(inst, initial, **kwargs)
+        return makespan
+
+    best, times, checksum = best_of(repeats, run)
+    return record(best, times, checksum, 's', 1.0)
+
+
+# =========================================================
+# MACRO-BENCHMARKS (TIEMPO HASTA OBJETIVO)
+# =========================================================
+def time_to_target(inst, target: float, seed: int, budget: float) -> Tuple[float, int]:
+    """Arranques GRASP + VNS (semillas seed, seed + 1, ...) hasta alcanzar 'target'.
+
+    Cada arranque para en cuanto llega al objetivo (lower_bound = target).
+
+    Returns:
+        (makespan alcanzado, arranques usados). Si se agota 'budget' sin
+        llegar, lanza RuntimeError: el benchmark no es comparable.
+    """
+    deadline = time.time() + budget
+    kwargs = dict(algorithm_kwargs(VNS_CONFIG, inst), lower_bound=target, deadline=deadline)
+    restarts = 0
+    while True:
+        _, makespan, _ = _run_restart(inst, variable_neighborhood_search, seed + restarts, kwargs)
+        restarts += 1
+        if makespan <= target:
+            return makespan, restarts
+        if time.time() >= deadline:
+            raise RuntimeError(f"{inst.name}: objetivo {target} no alcanzado en {budget}s "
+                               f"(mejor {makespan})")
+
+
+def bench_ttt(inst, target: float, seed: int, repeats: int) -> dict:
+    """Tiempo hasta 'target' (ver time_to_target); anota también los arranques usados."""
+    get_evaluator(inst)
+    used = []
+
+    def run():
+        makespan, restarts = time_to_target(inst, target, seed, MACRO_BUDGET)
+        used.append(restarts)
+        return makespan
+
+    best, times, checksum = best_of(repeats, run)
+    return record(best, times, checksum, 's', 1.0, target=target, restarts=used[-1])
+
+
+# =========================================================
+# EJECUCIÓN Y COMPARACIÓN
+# =========================================================
+def run_suite(suite: str, seed: int, repeats: int, macro_repeats: int,
+              only: Optional[str] = None) -> Dict[str, dict]:
+    """Ejecuta los benchmarks de 'suite' ('micro', 'macro' o 'all') cuyo nombre contiene 'only'."""
+    plan = []
+    if suite in ('micro', 'all'):
+        for size, name in MICRO_INSTANCES.items():
+            plan.append((f"makespan.{size}", name, lambda inst: bench_makespan(inst, seed, repeats)))
+            plan.append((f"grasp.{size}", name, lambda inst: bench_grasp(inst, seed, repeats)))
+            plan.append((f"tabu.{size}", name, lambda inst: bench_tabu(inst, seed, repeats)))
+    if suite in ('macro', 'all'):
+        for name, target in MACRO_TARGETS.items():
+            plan.append((f"ttt.{name}", name,
+                         lambda inst, target=target: bench_ttt(inst, target, seed, macro_repeats)))
+
+    results = {}
+    for bench, instance_name, func in plan:
+        if only and only not in bench:
+            continue
+        res = func(load_instance(instance_name))
+        res['instance'] = instance_name
+        results[bench] = res
+        print(f"{bench:<24} | {res['value']:>10.3f} {res['unit']:<3} | checksum {res['checksum']}")
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> bool:
+    """Imprime la comparación con la línea base. Devuelve True si no hay regresiones.
+
+    Un benchmark regresa si es más lento que la línea base en más de
+    'threshold' (fracción) o si, con la misma semilla, cambia su checksum.
+    """
+    same_seed = current['meta']['seed'] == baseline['meta']['seed']
+    ok = True
+    print(f"\n{'Benchmark':<24} | {'Base':>10} | {'Actual':>10} | {'Cambio':>8} | Estado")
+    print("-" * 72)
+    for bench, res in current['benchmarks'].items():
+        base = baseline['benchmarks'].get(bench)
+        if base is None:
+            print(f"{bench:<24} | {'-':>10} | {res['value']:>10.3f} | {'-':>8} | nuevo")
+            continue
+        change = res['value'] / base['value'] - 1
+        if same_seed and res['checksum'] != base['checksum']:
+            status = f"RESULTADO DISTINTO ({base['checksum']} -> {res['checksum']})"
+            ok = False
+        elif change > threshold:
+            status = "REGRESIÓN"
+            ok = False
+        elif change < -threshold:
+            status = "mejora"
+        else:
+            status = "ok"
+        print(f"{bench:<24} | {base['value']:>10.3f} | {res['value']:>10.3f} | {change:>+7.1%} | {status}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks con umbral de regresión")
+    parser.add_argument('--suite', choices=['micro', 'macro', 'all'], default='all')
+    parser.add_argument('--only', type=str, default=None, help="Solo los benchmarks cuyo nombre contiene este texto")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeats', type=int, default=5, help="Repeticiones de los micro-benchmarks")
+    parser.add_argument('--macro_repeats', type=int, default=3, help="Repeticiones de los macro-benchmarks")
+    parser.add_argument('--output', type=str, default=os.path.join('benchmarks', 'results.json'),
+                        help="JSON donde se guardan los resultados")
+    parser.add_argument('--baseline', type=str, default=None, help="JSON de una ejecución anterior para comparar")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Ralentización máxima admitida frente a la línea base (fracción, default: 0.10)")
+    args = parser.parse_args()
+
+    meta = {
+        'seed': args.seed,
+        'repeats': args.repeats,
+        'macro_repeats': args.macro_repeats,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    current = {'meta': meta, 'benchmarks': run_suite(args.suite, args.seed, args.repeats,
+                                                     args.macro_repeats, args.only)}
+
+    folder = os.path.dirname(args.output)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(current, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados en '{args.output}'")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if not compare(current, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
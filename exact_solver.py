@@ -2,6 +2,10 @@
 Solver Exacto CP-SAT para GCSP - Versión con Timeout Riguroso.
 - Usa multiprocessing para garantizar el límite de tiempo por instancia.
 - Reduce la explosión combinatoria comprobando solo grúas adyacentes.
+- Modo plantilla (--template): la estructura del modelo se construye una vez por
+  forma de instancia y solo se reasignan duraciones y horizonte en cada instancia.
+- Arranque en caliente (--warm_start): el VNS se ejecuta antes y su mejor
+  secuencia se pasa a CP-SAT como pista de solución (y cota superior si es factible).
 """
 
 import argparse
@@ -11,13 +15,17 @@ import re
 import time
 import multiprocessing
 from ortools.sat.python import cp_model
+from src.algorithms import multi_start_solver, variable_neighborhood_search
+from src.evaluator import get_evaluator
 from src.io_handler import load_instance_from_json
+from src.results import ResultSink, make_record, config_hash, completed_instances
 
 
 class GCSP_CP_SAT_Solver:
-    def __init__(self, instance, time_limit=7200):
+    def __init__(self, instance, time_limit=7200, template=None):
         self.instance = instance
         self.time_limit = time_limit
+        self.template = template # CPSATModelTemplate compatible (o None)
         self.model = cp_model.CpModel()
         
         self.tasks = instance.tasks
@@ -33,31 +41,59 @@ class GCSP_CP_SAT_Solver:
         self.depot_start = self.num_tasks
         
         # Horizonte Temporal
-        total_p = sum(t.p_0 for t in self.tasks)
-        max_dist = self.num_tasks * 20
-        max_travel = self.num_tasks * max_dist * self.t0
-        self.horizon = int(total_p + max_travel + 600)
+        self.horizon = compute_horizon(instance)
 
         # Variables
         self.starts = {}      
         self.ends = {}        
         self.presence = {}
+        self.arc_literals = {}   # (k, origen, destino) -> literal del circuito de la grúa k
+        self.order_literals = {} # (k, i, j) -> (i antes que j, j antes que i) del no cruce
         self.makespan = None
+        self.duration_constraints = [] # Índice en el proto de 'e_i == s_i + p_i'
+        self.warm_start_info = {}
         
         # Estado
         self.solver = None
         self.status = None
         self.solve_time = 0
+        self.build_time = 0
 
     def build_model(self):
-        print(f"   [Construyendo modelo... {self.num_tasks} Tareas, {self.num_cranes} Grúas]")
         start_build = time.time()
+        if self.template is not None:
+            self._bind_template()
+            self.build_time = time.time() - start_build
+            print(f"   [Modelo instanciado desde plantilla en {self.build_time:.3f}s]")
+            return
+
+        print(f"   [Construyendo modelo... {self.num_tasks} Tareas, {self.num_cranes} Grúas]")
+        count_constraints = self._build_structure()
+        self.build_time = time.time() - start_build
+        print(f"   [Modelo construido en {self.build_time:.2f}s. Restricciones de choque: {count_constraints}]")
+
+    def _bind_template(self):
+        """Toma el modelo de la plantilla y recupera las variables por su índice en el proto."""
+        self.model = self.template.instantiate(self.instance)
+        get_var = self.model.GetIntVarFromProtoIndex
+        self.starts = {i: get_var(idx) for i, idx in enumerate(self.template.start_vars)}
+        self.ends = {i: get_var(idx) for i, idx in enumerate(self.template.end_vars)}
+        get_bool = self.model.GetBoolVarFromProtoIndex
+        self.presence = {key: get_bool(idx) for key, idx in self.template.presence_vars.items()}
+        self.arc_literals = {key: get_bool(idx) for key, idx in self.template.arc_vars.items()}
+        self.order_literals = {key: (get_bool(a), get_bool(b))
+                               for key, (a, b) in self.template.order_vars.items()}
+        self.makespan = get_var(self.template.makespan_var)
+        self.duration_constraints = [idx for idx, _ in self.template.duration_constraints]
 
+    def _build_structure(self):
+        """Construye el modelo completo. Devuelve el nº de restricciones de no cruce."""
         # 1. Variables de Tiempo
         for i in self.all_tasks:
             self.starts[i] = self.model.NewIntVar(0, self.horizon, f's{i}')
             self.ends[i] = self.model.NewIntVar(0, self.horizon, f'e{i}')
-            self.model.Add(self.ends[i] == self.starts[i] + self.tasks[i].p_0)
+            ct = self.model.Add(self.ends[i] == self.starts[i] + self.tasks[i].p_0)
+            self.duration_constraints.append(ct.Index())
 
         self.makespan = self.model.NewIntVar(0, self.horizon, 'mk')
 
@@ -80,6 +116,7 @@ class GCSP_CP_SAT_Solver:
                     
                     lit = self.model.NewBoolVar(f'r_{i}_{j}_{k}')
                     arcs.append([i, j, lit])
+                    self.arc_literals[k, i, j] = lit
                     
                     self.model.AddImplication(lit, self.presence[i, k])
                     self.model.AddImplication(lit, self.presence[j, k])
@@ -93,6 +130,7 @@ class GCSP_CP_SAT_Solver:
                 # Start
                 s_lit = self.model.NewBoolVar(f'start_{k}_{i}')
                 arcs.append([depot_node, i, s_lit])
+                self.arc_literals[k, depot_node, i] = s_lit
                 self.model.AddImplication(s_lit, self.presence[i, k])
                 dist = abs(locations[depot_node] - locations[i])
                 self.model.Add(self.starts[i] >= int(dist * self.t0)).OnlyEnforceIf(s_lit)
@@ -100,11 +138,13 @@ class GCSP_CP_SAT_Solver:
                 # End
                 e_lit = self.model.NewBoolVar(f'end_{i}_{k}')
                 arcs.append([i, depot_node, e_lit])
+                self.arc_literals[k, i, depot_node] = e_lit
                 self.model.AddImplication(e_lit, self.presence[i, k])
 
             # Empty
             empty = self.model.NewBoolVar(f'empty_{k}')
             arcs.append([depot_node, depot_node, empty])
+            self.arc_literals[k, depot_node, depot_node] = empty
 
             self.model.AddCircuit(arcs)
 
@@ -125,6 +165,7 @@ class GCSP_CP_SAT_Solver:
                     
                     i_before_j = self.model.NewBoolVar(f'b_{i}_{j}')
                     j_before_i = self.model.NewBoolVar(f'b_{j}_{i}')
+                    self.order_literals[k, i, j] = (i_before_j, j_before_i)
                     
                     self.model.Add(self.ends[i] <= self.starts[j]).OnlyEnforceIf(i_before_j)
                     self.model.Add(self.ends[j] <= self.starts[i]).OnlyEnforceIf(j_before_i)
@@ -138,11 +179,81 @@ class GCSP_CP_SAT_Solver:
         for i in self.all_tasks:
             self.model.Add(self.makespan >= self.ends[i])
         self.model.Minimize(self.makespan)
-        
-        build_time = time.time() - start_build
-        print(f"   [Modelo construido en {build_time:.2f}s. Restricciones de choque: {count_constraints}]")
+        return count_constraints
+
+    # --- Arranque en caliente ---
+    def add_warm_start(self, sequence_ids):
+        """Pasa a CP-SAT el plan de una secuencia de la metaheurística.
+
+        La secuencia se decodifica con el simulador (grúa, inicio y fin de cada
+        tarea). Si el plan cumple todas las restricciones del modelo se da como
+        pista completa (rutas, órdenes de no cruce, tiempos) y su makespan como
+        cota superior del objetivo. Si no (el simulador y el modelo no modelan
+        las interferencias igual), solo se sugieren asignación y tiempos, sin cota,
+        para no descartar soluciones válidas.
+
+        Returns:
+            Diccionario con 'warm_makespan' y 'hint_feasible'.
+        """
+        position = {t.id: i for i, t in enumerate(self.tasks)}
+        crane_of, start_of = {}, {}
+        for task_id, k, start, _ in get_evaluator(self.instance).decode(sequence_ids):
+            i = position[task_id]
+            crane_of[i] = k - 1
+            start_of[i] = int(round(start))
+        end_of = {i: start_of[i] + self.tasks[i].p_0 for i in self.all_tasks}
+        makespan = max(end_of.values())
+
+        routes = {k: sorted((i for i in self.all_tasks if crane_of[i] == k), key=lambda i: start_of[i])
+                  for k in self.all_cranes}
+        feasible = self._schedule_is_feasible(crane_of, routes, start_of, end_of)
+
+        for i in self.all_tasks:
+            self.model.AddHint(self.starts[i], start_of[i])
+            self.model.AddHint(self.ends[i], end_of[i])
+            for k in self.all_cranes:
+                self.model.AddHint(self.presence[i, k], crane_of[i] == k)
+
+        if feasible:
+            self.model.AddHint(self.makespan, makespan)
+            active_arcs = set()
+            for k, route in routes.items():
+                depot = self.depot_start + k
+                nodes = [depot] + route + [depot]
+                active_arcs.update((k, a, b) for a, b in zip(nodes, nodes[1:]))
+            for key, lit in self.arc_literals.items():
+                self.model.AddHint(lit, key in active_arcs)
+            for (k, i, j), (i_before_j, j_before_i) in self.order_literals.items():
+                self.model.AddHint(i_before_j, end_of[i] <= start_of[j])
+                self.model.AddHint(j_before_i, end_of[j] <= start_of[i])
+            self.model.Add(self.makespan <= makespan)
+
+        self.warm_start_info = {'warm_makespan': makespan, 'hint_feasible': feasible}
+        return self.warm_start_info
 
-    def solve(self):
+    def _schedule_is_feasible(self, crane_of, routes, start_of, end_of):
+        """Comprueba un plan contra las restricciones del modelo (viajes, no cruce, horizonte)."""
+        locations = [t.location for t in self.tasks] + [c.location for c in self.cranes]
+        if min(start_of.values()) < 0 or max(end_of.values()) > self.horizon:
+            return False
+        for k, route in routes.items():
+            prev = self.depot_start + k
+            ready = 0
+            for i in route:
+                if start_of[i] < ready + int(abs(locations[prev] - locations[i]) * self.t0):
+                    return False
+                prev, ready = i, end_of[i]
+        for k in range(self.num_cranes - 1):
+            for i in routes[k]:
+                for j in routes[k + 1]:
+                    if locations[i] + self.s <= locations[j]:
+                        continue
+                    if end_of[i] > start_of[j] and end_of[j] > start_of[i]:
+                        return False
+        return True
+
+    def solve(self, on_solution=None):
+        """Resuelve el modelo. 'on_solution(callback)' se llama en cada solución nueva."""
         self.solver = cp_model.CpSolver()
         # Límite interno de CP-SAT (primera línea de defensa)
         self.solver.parameters.max_time_in_seconds = float(self.time_limit)
@@ -152,8 +263,10 @@ class GCSP_CP_SAT_Solver:
         print(f"   [Iniciando Solver... Límite: {self.time_limit}s]")
         start_time = time.time()
         
-        self.status = self.solver.Solve(self.model)
+        timer = _FirstSolutionTimer(start_time, on_solution)
+        self.status = self.solver.Solve(self.model, timer)
         self.solve_time = time.time() - start_time
+        self.first_solution = timer.first
         
         return self._get_results()
 
@@ -164,8 +277,12 @@ class GCSP_CP_SAT_Solver:
             'makespan': None,
             'lower_bound': None,
             'gap': None,
-            'time': self.solve_time
+            'time': self.solve_time,
+            'build_time': self.build_time,
+            'first_solution_time': self.first_solution[0] if self.first_solution else None,
+            'first_solution_makespan': self.first_solution[1] if self.first_solution else None,
         }
+        result.update(self.warm_start_info)
         
         if self.status == cp_model.OPTIMAL:
             result['status'] = 'OPTIMAL'
@@ -187,19 +304,162 @@ class GCSP_CP_SAT_Solver:
         return result
 
 
+class _FirstSolutionTimer(cp_model.CpSolverSolutionCallback):
+    """Anota el instante (desde el inicio de solve) y el valor de la primera solución.
+
+    Si se da 'on_solution', se llama con el propio callback en cada solución
+    (para leer ObjectiveValue/BestObjectiveBound o llamar a StopSearch).
+    """
+
+    def __init__(self, start_time, on_solution=None):
+        super().__init__()
+        self.start_time = start_time
+        self.on_solution = on_solution
+        self.first = None
+
+    def on_solution_callback(self):
+        if self.first is None:
+            self.first = (time.time() - self.start_time, self.ObjectiveValue())
+        if self.on_solution is not None:
+            self.on_solution(self)
+
+
+def compute_horizon(instance):
+    """Horizonte temporal del modelo (cota superior holgada de cualquier makespan)."""
+    num_tasks = len(instance.tasks)
+    total_p = sum(t.p_0 for t in instance.tasks)
+    max_dist = num_tasks * 20
+    max_travel = num_tasks * max_dist * instance.t_0
+    return int(total_p + max_travel + 600)
+
+
+# =========================================================
+# PLANTILLA DE MODELO (MISMA FORMA -> MISMA ESTRUCTURA)
+# =========================================================
+def template_key(instance):
+    """Forma de una instancia: todo lo que fija la estructura del modelo salvo las duraciones.
+
+    Las localizaciones determinan los tiempos de viaje de los arcos y qué pares
+    de tareas necesitan restricción de no cruce, así que forman parte de la clave.
+    """
+    return (len(instance.tasks), len(instance.cranes), instance.s, instance.t_0,
+            tuple(t.location for t in instance.tasks),
+            tuple(c.location for c in instance.cranes))
+
+
+class CPSATModelTemplate:
+    """
+    Modelo CP-SAT construido una vez para una forma de instancia (template_key).
+    p_0 solo aparece en las restricciones 'e_i == s_i + p_i' y, a través del
+    horizonte, en los dominios de s_i, e_i y del makespan; instantiate() clona
+    el modelo y reescribe únicamente esos valores.
+
+    Con 'fork' (Linux) el proceso hijo hereda la plantilla sin copiarla. Con
+    'spawn' (Windows) se serializa en formato texto: el CpModelProto de
+    ortools 9.15 (pybind) no ofrece SerializeToString/ParseFromString ni
+    ninguna otra vía de lectura binaria. Ese pickle no es barato: en
+    large_70x5_1 ocupa 16.6 MB y la ida y vuelta tarda ~0.42s (0.12s
+    serializar, 0.30s parsear), casi lo mismo que construir el modelo
+    (~0.49s). Con spawn la plantilla apenas ahorra tiempo.
+    """
+
+    def __init__(self, instance):
+        start = time.time()
+        solver = GCSP_CP_SAT_Solver(instance)
+        solver._build_structure()
+        proto = solver.model.Proto()
+
+        self.key = template_key(instance)
+        self.model = solver.model
+        self.start_vars = [solver.starts[i].Index() for i in solver.all_tasks]
+        self.end_vars = [solver.ends[i].Index() for i in solver.all_tasks]
+        # (índice de la restricción, signo): la restricción se guarda como
+        # c * e_i - c * s_i == c * p_0, así que el signo es el coeficiente de e_i
+        self.duration_constraints = []
+        for idx, end_var in zip(solver.duration_constraints, self.end_vars):
+            linear = proto.constraints[idx].linear
+            self.duration_constraints.append((idx, linear.coeffs[list(linear.vars).index(end_var)]))
+        self.makespan_var = solver.makespan.Index()
+        self.presence_vars = {key: var.Index() for key, var in solver.presence.items()}
+        self.arc_vars = {key: var.Index() for key, var in solver.arc_literals.items()}
+        self.order_vars = {key: (a.Index(), b.Index()) for key, (a, b) in solver.order_literals.items()}
+        self.build_time = time.time() - start
+
+    def instantiate(self, instance):
+        """Devuelve un CpModel nuevo con las duraciones y el horizonte de 'instance'."""
+        if template_key(instance) != self.key:
+            raise ValueError(f"La instancia {instance.name} no tiene la forma de la plantilla")
+        model = self.model.Clone()
+        proto = model.Proto()
+
+        # Asignación elemento a elemento: los campos repetidos del proto no admiten slices en todas las versiones
+        for (idx, sign), task in zip(self.duration_constraints, instance.tasks):
+            domain = proto.constraints[idx].linear.domain
+            domain[0] = domain[1] = sign * task.p_0
+        horizon = compute_horizon(instance)
+        for idx in self.start_vars + self.end_vars + [self.makespan_var]:
+            proto.variables[idx].domain[1] = horizon
+        return model
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['model'] = str(self.model.Proto())
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.model = cp_model.CpModel()
+        proto = self.model.Proto()
+        if hasattr(proto, 'parse_text_format'):
+            proto.parse_text_format(state['model'])
+        else: # ortools con protos de protobuf
+            from google.protobuf import text_format
+            text_format.Parse(state['model'], proto)
+
+
 # =========================================================
 # FUNCIÓN PARA EJECUTAR EN PROCESO SEPARADO (TIMEOUT REAL)
 # =========================================================
-def _solve_instance_worker(filepath, time_limit, result_queue):
+def run_warm_start(inst, warm_time):
+    """Ejecuta GRASP + VNS/Tabu (parámetros de main.py) durante 'warm_time' segundos.
+
+    Returns:
+        (mejor secuencia, segundos empleados).
+    """
+    start = time.time()
+    n_tasks, n_cranes = len(inst.tasks), len(inst.cranes)
+    best_seq, _, _ = multi_start_solver(
+        instance=inst,
+        algorithm_func=variable_neighborhood_search,
+        n_restarts=1,
+        grasp_alpha=0.5,
+        tabu_tenure=8,
+        max_iter=6 * n_tasks * n_cranes,
+        candidates_per_iter=20,
+        vns_loops=10,
+        init_strategy='grasp',
+        time_budget=warm_time
+    )
+    return best_seq, time.time() - start
+
+
+def _solve_instance_worker(filepath, time_limit, result_queue, template=None, warm_time=None):
     """Función que se ejecuta en un proceso hijo.
     
     Construye y resuelve el modelo CP-SAT, y envía el resultado
-    a través de una Queue compartida con el proceso padre.
+    a través de una Queue compartida con el proceso padre. Con 'warm_time',
+    antes se ejecuta el VNS y su mejor secuencia sirve de arranque en caliente.
     """
     try:
         inst = load_instance_from_json(filepath)
-        solver = GCSP_CP_SAT_Solver(inst, time_limit=time_limit)
+        solver = GCSP_CP_SAT_Solver(inst, time_limit=time_limit, template=template)
         solver.build_model()
+        if warm_time:
+            best_seq, elapsed = run_warm_start(inst, warm_time)
+            info = solver.add_warm_start(best_seq)
+            info['warm_time'] = elapsed
+            print(f"   [Arranque en caliente: VNS {info['warm_makespan']} en {elapsed:.1f}s | "
+                  f"pista {'completa + cota' if info['hint_feasible'] else 'parcial'}]")
         res = solver.solve()
         result_queue.put(res)
     except Exception as e:
@@ -214,7 +474,7 @@ def _solve_instance_worker(filepath, time_limit, result_queue):
         })
 
 
-def solve_with_hard_timeout(filepath, time_limit):
+def solve_with_hard_timeout(filepath, time_limit, template=None, warm_time=None):
     """Ejecuta el solver en un proceso separado con timeout garantizado.
     
     Si el proceso excede time_limit, se termina forzosamente y se
@@ -225,14 +485,15 @@ def solve_with_hard_timeout(filepath, time_limit):
     
     process = multiprocessing.Process(
         target=_solve_instance_worker,
-        args=(filepath, time_limit, result_queue)
+        args=(filepath, time_limit, result_queue, template, warm_time)
     )
     
     start_time = time.time()
     process.start()
     
     # Esperar al proceso con un margen de 30s extra para build_model + overhead
-    process.join(timeout=time_limit + 30)
+    # (más el presupuesto del arranque en caliente, que va antes del solver)
+    process.join(timeout=time_limit + (warm_time or 0) + 30)
     
     elapsed = time.time() - start_time
     
@@ -286,6 +547,14 @@ def main():
     parser.add_argument('--size', type=str, required=True, choices=['small', 'medium', 'large'])
     parser.add_argument('--time_limit', type=int, default=7200,
                         help='Límite de tiempo POR INSTANCIA en segundos (default: 7200 = 2h)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Saltar las instancias que ya tienen resultado con el mismo límite de tiempo')
+    parser.add_argument('--template', action='store_true',
+                        help='Reutilizar la estructura del modelo entre instancias de la misma forma')
+    parser.add_argument('--warm_start', action='store_true',
+                        help='Ejecutar antes el VNS y pasar su mejor solución como pista a CP-SAT')
+    parser.add_argument('--warm_time', type=float, default=30,
+                        help='Segundos de VNS para el arranque en caliente (default: 30)')
     args = parser.parse_args()
     
     files = glob.glob(f"instances/{args.size}_*.json")
@@ -295,26 +564,51 @@ def main():
         print("No se encontraron instancias.")
         return
 
-    out_file = f"resultados_exacto_riguroso_{args.size}.txt"
+    out_file = f"resultados_exacto_{args.size}.jsonl"
+    config = {'solver': 'cp-sat', 'time_limit': args.time_limit}
+    if args.warm_start:
+        config['warm_time'] = args.warm_time
+    config_id = config_hash(config)
+
+    if args.resume:
+        done = completed_instances(out_file, config_id)
+        files = [fp for fp in files if os.path.splitext(os.path.basename(fp))[0] not in done]
+        print(f"Reanudando (config {config_id}): {len(done)} instancias ya resueltas, {len(files)} pendientes.")
     
     print(f"\n{'='*90}")
-    print(f" SOLVER EXACTO CP-SAT | SIZE: {args.size.upper()} | LIMIT: {args.time_limit}s/instancia")
+    print(f" SOLVER EXACTO CP-SAT | SIZE: {args.size.upper()} | LIMIT: {args.time_limit}s/instancia | CONFIG: {config_id}")
     print(f"{'='*90}")
     print(f"{'Instancia':<25} | {'Status':<10} | {'Makespan':<10} | {'Time':<8} | {'Gap'}")
     print("-" * 90)
     
-    with open(out_file, "w") as f:
-        f.write("Instancia,Status,Makespan,Time,Gap\n")
-        
+    templates = {} # template_key -> CPSATModelTemplate (se construyen en el proceso padre)
+
+    with ResultSink(out_file) as sink:
         for filepath in files:
+            template, template_time = None, 0.0
+            if args.template:
+                key = template_key(load_instance_from_json(filepath))
+                if key not in templates:
+                    templates[key] = CPSATModelTemplate(load_instance_from_json(filepath))
+                    template_time = templates[key].build_time
+                    print(f"   [Plantilla {key[0]}x{key[1]} construida en {template_time:.2f}s]")
+                template = templates[key]
+
             # Ejecutar solver con timeout REAL garantizado por multiprocessing
-            res = solve_with_hard_timeout(filepath, args.time_limit)
+            res = solve_with_hard_timeout(filepath, args.time_limit, template,
+                                          args.warm_time if args.warm_start else None)
 
             mk = f"{res['makespan']:.1f}" if res['makespan'] else "-"
             gap = f"{res['gap']:.2f}" if res['gap'] is not None else "-"
             
             print(f"{res['instance_name']:<25} | {res['status']:<10} | {mk:<10} | {res['time']:.2f} s   | {gap}%")
-            f.write(f"{res['instance_name']},{res['status']},{mk},{res['time']},{gap}\n")
+            sink.write(make_record('exact', res['instance_name'], res['status'], res['makespan'],
+                                   res['time'], res['lower_bound'], res['gap'],
+                                   time_limit=args.time_limit, config=config_id,
+                                   build_time=res.get('build_time'), template_time=template_time,
+                                   **{k: res[k] for k in ('first_solution_time', 'first_solution_makespan',
+                                                          'warm_makespan', 'warm_time', 'hint_feasible')
+                                      if k in res}))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -2,10 +2,14 @@
 Script para generar los CSVs de resumen para TODAS las instancias (small, medium, large).
 Calcula la media aritmética por combinación (NxM) a partir de los archivos de resultados.
 """
+import argparse
 import csv
 import os
 from collections import defaultdict
-from typing import Dict, List, Tuple
+from itertools import chain
+from typing import Dict, List, Optional, Tuple
+
+from src.results import read_results, summarize_by_combination
 
 BASE_DIR = r"c:\Users\jocarles\Documents\resolucion_problemas_metaheuristicas_trabajo\results_v2"
 
@@ -178,7 +182,74 @@ def generate_csv(size: str) -> None:
     print(content)
 
 
+def generate_csv_from_results(size: str, results_files: List[str], output_path: str,
+                              config_id: Optional[str] = None) -> None:
+    """Genera el CSV de resumen a partir de archivos de resultados JSON Lines (src/results.py).
+
+    Lee todos los archivos en una sola pasada y usa las mismas columnas que
+    generate_csv: el solver exacto por un lado y la metaheurística por método
+    de inicialización ('random' / 'grasp') por otro. Las medias se calculan
+    por configuración (campo 'config'): cada configuración presente tiene sus
+    propias columnas, con su huella como sufijo ('MK Grasp [3f2a...]'). Con
+    'config_id' solo se leen los registros de esa configuración (la huella que
+    imprimen main.py y exact_solver.py) y las columnas no llevan sufijo.
+
+    Args:
+        size: Tamaño ('small', 'medium', 'large'); filtra por prefijo del nombre.
+        results_files: Archivos .jsonl escritos por main.py / exact_solver.py.
+        output_path: Ruta del CSV de salida.
+        config_id: Huella de configuración a la que se limita el resumen (None = todas).
+    """
+    records = (r for r in chain.from_iterable(read_results(p) for p in results_files)
+               if r['instance'].startswith(f"{size}_")
+               and (config_id is None or r.get('config') == config_id))
+    summary = summarize_by_combination(records)
+
+    columns = {
+        ('exact', None): ('MK exacto', 'Time Exacto', None),
+        ('metaheuristic', 'random'): ('MK random', 'Time Random', 'GAP Random'),
+        ('metaheuristic', 'grasp'): ('MK Grasp', 'Time GRASP', 'GAP GRASP'),
+    }
+    # Registros sin 'config' (anteriores a --resume) conservan los nombres originales
+    groups = sorted((g for g in summary if g[:2] in columns),
+                    key=lambda g: (list(columns).index(g[:2]), g[2] or ''))
+    fieldnames = ['Combination']
+    rows: Dict[str, dict] = defaultdict(dict)
+    for group in groups:
+        suffix = f" [{group[2]}]" if group[2] is not None and config_id is None else ''
+        mk_col, time_col, gap_col = (c + suffix if c else None for c in columns[group[:2]])
+        fieldnames += [c for c in (mk_col, time_col, gap_col) if c]
+        for comb, stats in summary[group].items():
+            if stats['n'] == 0:
+                continue
+            rows[comb][mk_col] = round(stats['makespan'], 4)
+            rows[comb][time_col] = round(stats['time'], 4)
+            if gap_col and stats['gap'] is not None:
+                rows[comb][gap_col] = round(stats['gap'], 4)
+
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, restval='')
+        writer.writeheader()
+        for comb in sorted(rows, key=lambda x: [int(c) for c in x.split('x')]):
+            writer.writerow({'Combination': comb, **rows[comb]})
+
+    print(f"  -> CSV guardado en: {output_path} ({len(rows)} combinaciones, {len(groups)} grupos)")
+
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="CSVs de resumen por combinación NxM")
+    parser.add_argument('--results', type=str, nargs='+', default=None,
+                        help="Archivos .jsonl (src/results.py); sin él se parsean los .txt de BASE_DIR")
+    parser.add_argument('--out_dir', type=str, default='.', help="Directorio de salida con --results")
+    parser.add_argument('--config', type=str, default=None,
+                        help="Huella de configuración a resumir con --results (default: una columna por configuración)")
+    args = parser.parse_args()
+
     for size in ['small', 'medium', 'large']:
-        generate_csv(size)
+        if args.results:
+            generate_csv_from_results(size, args.results,
+                                      os.path.join(args.out_dir, f"resumen_resultados_{size}.csv"),
+                                      args.config)
+        else:
+            generate_csv(size)
     print("\n=== COMPLETADO ===")
@@ -1,74 +1,32 @@
-import time
+"""
+Grid search de hiperparámetros para instancias MEDIUM.
+El motor (Pool de procesos, caché en disco y successive halving) está en src/grid_search.py.
+
+Uso (desde la raíz del repositorio):
+    python -m grid_search_results.grid_search_medium_instance --workers 4 --halving
+"""
+import random
 from src.problem import generate_all_medium_instances
-from src.algorithms import multi_start_solver, variable_neighborhood_search
-
-def run_grid_search_medium():
-    # 1. Definir los parámetros a probar (El "Menú")
-    tabu_tenure_list = [5, 8, 10, 12]
-    candidates_list = [360, 420, 580, 760]
+from src.grid_search import run_grid_search_cli
 
 
-    # 2. Cargar las instancias
+def run_grid_search_medium():
+    # 1. Definir los parámetros a probar
+    space = {
+        'tenure': [5, 8, 10, 12],
+        'candidates': [360, 420, 580, 760],
+    }
+    # Parámetros fijos (max_iter fijo a 50).
+    # Cada celda se repite con 3 semillas, como los n_restarts=3 originales.
+    base_params = {'alpha': 0.5, 'vns_loops': 5, 'max_iter': 50}
+
+    # 2. Generar las instancias (semilla fija: la caché en disco las reconoce entre ejecuciones)
     print("Generando instancias MEDIUM para el test...")
+    random.seed(42)
     instances = generate_all_medium_instances()
-    
-    print(f"\n--- INICIANDO GRID SEARCH ({len(tabu_tenure_list) * len(candidates_list)} combinaciones) ---")
-    print(f"Usando límite de iteraciones dinámico: 6 * n * m")
-    
-    best_config = None
-    best_avg_score = float('inf')
-
-    # 3. Bucles Anidados: Probar cada combinación de Hiperparámetros
-    for tenure in tabu_tenure_list:
-        for candidates in candidates_list:
-            
-            print(f"\n[Evaluando Configuración] Tenure: {tenure} | Candidates: {candidates}")
-            start_time = time.time()
-            total_makespan = 0
-
-            # Probar esta configuración en TODAS las instancias del grupo
-            for instance in instances:
-                # Calculamos n y m para esta instancia específica (según el paper)
-                n = len(instance.tasks)
-                m = len(instance.cranes)
-                
-                # Configuramos los parámetros actuales
-                current_params = {
-                    'grasp_alpha': 0.5,
-                    'tabu_tenure': tenure,
-                    'candidates_per_iter': candidates,
-                    'max_iter': 50,  # Aplicación de la fórmula del paper 
-                    'vns_loops': 5
-                }
 
-                # Ejecutamos el solver con multi-start
-                _, makespan, _ = multi_start_solver(
-                    instance=instance,
-                    algorithm_func=variable_neighborhood_search,
-                    n_restarts=3, # Se mantiene en 3 para agilizar el tuning
-                    **current_params
-                )
-                total_makespan += makespan
-            
-            # Calcular promedio de la configuración actual
-            avg_makespan = total_makespan / len(instances)
-            elapsed = time.time() - start_time
-            
-            print(f"  -> Resultado: Promedio Makespan = {avg_makespan:.2f} (Tiempo: {elapsed:.2f}s)")
-            
-            # Actualizar el mejor candidato encontrado
-            if avg_makespan < best_avg_score:
-                best_avg_score = avg_makespan
-                best_config = (tenure, candidates)
-                print(f"¡Nuevo Mejor Candidato!")
+    return run_grid_search_cli('medium', instances, space, base_params, seeds=(0, 1, 2))
 
-    print("\n" + "="*40)
-    print(f"GRID SEARCH FINALIZADO")
-    print(f"Mejor Configuración Encontrada:")
-    print(f"  - Tabu Tenure: {best_config[0]}")
-    print(f"  - Candidates:  {best_config[1]}")
-    print(f"  - Makespan Promedio: {best_avg_score:.2f}")
-    print("="*40)
 
 if __name__ == "__main__":
-    run_grid_search_medium()
\ No newline at end of file
+    run_grid_search_medium()
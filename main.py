@@ -2,17 +2,14 @@ import argparse
 import glob
 import os
 import re
-import signal
 from collections import defaultdict
-from src.algorithms import multi_start_solver, variable_neighborhood_search, calculate_lower_bound
+from src.algorithms import multi_start_solver, variable_neighborhood_search
+from src.bounds import compute_lower_bound
 from src.io_handler import load_instance_from_json
-
-# --- FUNCIÓN DE TIEMPO LÍMITE (TIMEOUT) ---
-class TimeoutException(Exception):
-    pass
-
-def timeout_handler(signum, frame):
-    raise TimeoutException()
+from src.profiling import SolverProfile, profile_path
+from src.supervisor import WorkerPool, JOB_DONE, JOB_TIMEOUT
+from src.results import (ResultSink, make_record, gap_percent, config_hash, completed_instances,
+                         STATUS_OK, STATUS_TIMEOUT, STATUS_ERROR)
 
 # --- FUNCIÓN DE ORDENACIÓN ---
 def get_sort_key(filepath):
@@ -22,6 +19,120 @@ def get_sort_key(filepath):
         return int(numbers[0]), int(numbers[1]), int(numbers[2])
     return 0, 0, 0
 
+# =========================================================
+# EJECUCIÓN DE UNA INSTANCIA
+# =========================================================
+TIME_LIMIT = 600 # Segundos por instancia
+TIME_GRACE = 30  # Margen del corte forzoso: el VNS ya para solo al llegar a TIME_LIMIT
+
+def run_metaheuristic(inst, params, lb=None, on_improve=None, profile=None):
+    """Ejecuta GRASP + VNS/Tabu sobre la instancia. Devuelve (makespan medio, tiempo medio).
+
+    Con params['stop_at_bound'] la búsqueda para al alcanzar la cota 'lb'.
+    'on_improve(makespan, secuencia)' se pasa al Tabu (ver tabu_search).
+    'profile' (SolverProfile) recoge los contadores del solver (ver src/profiling.py).
+    """
+    n_tasks = len(inst.tasks)
+    n_cranes = len(inst.cranes)
+    
+    dynamic_iter = 6 * n_tasks * n_cranes
+    sn_param = 3 * n_tasks
+
+    best_seq, avg_mk, avg_t = multi_start_solver(
+        instance=inst,
+        algorithm_func=variable_neighborhood_search,
+        n_restarts=params['restarts'], 
+        grasp_alpha=0.5,
+        tabu_tenure=params['tenure'],
+        max_iter=dynamic_iter,
+        candidates_per_iter=params['candidates'],
+        vns_loops=10,
+        init_strategy=params['init'],
+        pool_size=sn_param,
+        workers=params['workers'],
+        seed=params['seed'],
+        time_budget=TIME_LIMIT,
+        lower_bound=lb if params.get('stop_at_bound') else None,
+        on_improve=on_improve,
+        profile=profile
+    )
+    return avg_mk, avg_t
+
+def format_row(name, lb, avg_mk=None, avg_t=None, status=STATUS_TIMEOUT):
+    """Construye el registro de resultados (ver src/results.py). Sin makespan se marca con 'status' (TIMEOUT/ERROR)."""
+    if avg_mk is None:
+        return make_record('metaheuristic', name, status, time=TIME_LIMIT, lb=lb)
+    return make_record('metaheuristic', name, STATUS_OK, avg_mk, avg_t, lb, gap_percent(avg_mk, lb))
+
+def print_row(row):
+    """Imprime un registro en la tabla de consola."""
+    if row['makespan'] is None:
+        mk, gap = row['status'], "N/A"
+    else:
+        mk, gap = f"{row['makespan']:.1f}", f"{row['gap']:.2f}"
+    print(f"{row['instance']:<22} | {mk:<10} | {row['time']:<10.2f} | {row['lb']:<8.1f} | {gap:<8}")
+
+# =========================================================
+# EJECUCIÓN SUPERVISADA (PROCESOS REUTILIZABLES, SIN SIGALRM)
+# =========================================================
+def _solve_instance_job(filepath, params, report=None):
+    """Trabajo del WorkerPool: resuelve una instancia y devuelve su fila.
+
+    Envía por 'report' la cota y, con arranques en serie, cada mejora del
+    incumbente, para que el supervisor conserve el mejor makespan si tiene
+    que cortar el trabajo. Con params['profile_dir'] escribe además el perfil
+    del solver de la instancia en esa carpeta.
+    """
+    inst = load_instance_from_json(filepath)
+    lb = compute_lower_bound(inst)
+    on_improve = None
+    if report is not None:
+        progress = {'instance': inst.name, 'lb': lb, 'incumbent': None}
+        report(dict(progress))
+        if (params['workers'] or 1) <= 1:
+            # Con workers > 1 los arranques van a un Pool y el gancho no se puede serializar
+            def on_improve(makespan, seq):
+                if progress['incumbent'] is None or makespan < progress['incumbent']:
+                    progress['incumbent'] = makespan
+                    report(dict(progress))
+    profile = SolverProfile() if params.get('profile_dir') else None
+    avg_mk, avg_t = run_metaheuristic(inst, params, lb, on_improve, profile)
+    if profile is not None:
+        profile.dump(profile_path(params['profile_dir'], inst.name), instance=inst.name,
+                     makespan=avg_mk, time=avg_t, params=params)
+    return format_row(inst.name, lb, avg_mk, avg_t)
+
+def run_supervised(files, params, jobs, on_result):
+    """Resuelve las instancias en un WorkerPool de 'jobs' procesos reutilizables.
+
+    Cada instancia tiene un límite de reloj de TIME_LIMIT + TIME_GRACE. El propio
+    VNS para al llegar a TIME_LIMIT y devuelve su mejor solución, así que el
+    corte forzoso es solo una red de seguridad; si llega a actuar, la fila
+    (TIMEOUT) guarda en 'incumbent' el último mejor makespan recibido.
+    Cada fila se entrega a 'on_result' en cuanto termina su instancia, por lo
+    que con jobs > 1 el orden de llegada no es el orden de 'files'.
+    """
+    def handle(outcome):
+        if outcome['status'] == JOB_DONE:
+            on_result(outcome['result'])
+            return
+        progress = outcome['progress']
+        if progress is None:
+            inst = load_instance_from_json(outcome['key'])
+            progress = {'instance': inst.name, 'lb': compute_lower_bound(inst), 'incumbent': None}
+        if outcome['status'] == JOB_TIMEOUT:
+            print(f"!!! {progress['instance']:<18} -> Límite de {TIME_LIMIT}s alcanzado. Saltando...")
+            row = format_row(progress['instance'], progress['lb'])
+        else:
+            row = format_row(progress['instance'], progress['lb'], status=STATUS_ERROR)
+            row['error'] = outcome.get('error')
+        row['incumbent'] = progress['incumbent']
+        on_result(row)
+
+    with WorkerPool(jobs) as pool:
+        pool.run([(fp, _solve_instance_job, (fp, params)) for fp in files],
+                 TIME_LIMIT + TIME_GRACE, handle)
+
 def main():
     parser = argparse.ArgumentParser(description="Metaheurística (VNS/Tabu) para GCSP")
     parser.add_argument('--size', type=str, choices=['small', 'medium', 'large'], required=True)
@@ -29,8 +140,18 @@ def main():
     parser.add_argument('--tenure', type=int, default=8, help="Tabu Tenure")
     parser.add_argument('--candidates', type=int, default=20, help="Candidatos GRASP")
     parser.add_argument('--init', type=str, default='grasp', choices=['grasp', 'random'])
+    parser.add_argument('--workers', type=int, default=1, help="Procesos para repartir los arranques")
+    parser.add_argument('--seed', type=int, default=None, help="Semilla base (arranque i -> seed + i)")
+    parser.add_argument('--jobs', type=int, default=1, help="Procesos del supervisor (instancias resueltas en paralelo)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Saltar las instancias que ya tienen resultado con la misma configuración")
+    parser.add_argument('--stop_at_bound', action='store_true',
+                        help="Parar (y no lanzar más arranques) al alcanzar la cota inferior")
+    parser.add_argument('--profile', action='store_true',
+                        help="Guardar contadores y tiempos por fase del solver en perfiles_<size>/<instancia>.json")
     
     args = parser.parse_args()
+    params = vars(args)
 
     search_pattern = f"instances/{args.size}_*.json"
     files = glob.glob(search_pattern)
@@ -40,73 +161,49 @@ def main():
         return
 
     files.sort(key=get_sort_key)
-    output_file = f"resultados_simplificados_{args.size}.txt"
-
-    print(f"\n=== METAHEURÍSTICA | SIZE: {args.size.upper()} | LIMIT: 600s ===")
+    output_file = f"resultados_{args.size}.jsonl"
+    # El perfilado no cambia el experimento: no entra en la huella de configuración
+    params['profile_dir'] = f"perfiles_{args.size}" if args.profile else None
+
+    # Parámetros que se guardan junto a cada registro. La huella de configuración
+    # excluye workers/jobs: solo reparten el trabajo, no cambian el experimento.
+    run_params = {k: params[k] for k in ('restarts', 'tenure', 'candidates', 'workers', 'seed')}
+    # 'lb' identifica la cota del GAP: los registros calculados con la cota
+    # clásica (calculate_lower_bound) quedan con otra huella y no se mezclan
+    config = {'init': args.init, 'restarts': args.restarts, 'tenure': args.tenure,
+              'candidates': args.candidates, 'seed': args.seed, 'time_limit': TIME_LIMIT,
+              'lb': 'compute_lower_bound'}
+    if args.stop_at_bound:
+        # Solo se añade si está activo: sin el flag la huella no depende de él
+        config['stop_at_bound'] = True
+    config_id = config_hash(config)
+
+    if args.resume:
+        done = completed_instances(output_file, config_id)
+        files = [fp for fp in files if os.path.splitext(os.path.basename(fp))[0] not in done]
+        print(f"Reanudando (config {config_id}): {len(done)} instancias ya resueltas, {len(files)} pendientes.")
+
+    print(f"\n=== METAHEURÍSTICA | SIZE: {args.size.upper()} | LIMIT: {TIME_LIMIT}s | JOBS: {args.jobs} "
+          f"| CONFIG: {config_id} ===")
     print("-" * 85)
     print(f"{'Instancia':<22} | {'Makespan':<10} | {'Tiempo(s)':<10} | {'LB':<8} | {'GAP %':<8}")
     print("-" * 85)
 
-    # Configurar la señal de alarma (Solo funciona en Sistemas UNIX/Linux/Mac)
-    # Si usas Windows, este método requiere una alternativa con Multiprocessing
-    if os.name != 'nt':
-        signal.signal(signal.SIGALRM, timeout_handler)
-
-    with open(output_file, "w") as f:
-        f.write(f"Instancia,Makespan,Tiempo,LB,GAP\n")
-
-        for filepath in files:
-            inst = load_instance_from_json(filepath)
-            n_tasks = len(inst.tasks)
-            n_cranes = len(inst.cranes)
-            
-            dynamic_iter = 6 * n_tasks * n_cranes
-            sn_param = 3 * n_tasks
-            lb = calculate_lower_bound(inst)
-            
-            # Variables para el resultado
-            mk, t, gap = "TIMEOUT", "600.00", "N/A"
-
-            # ACTIVAR EL LÍMITE DE TIEMPO REAL (600 SEGUNDOS)
-            if os.name != 'nt':
-                signal.alarm(600) 
-
-            try:
-                # Ejecutar algoritmo
-                best_seq, avg_mk, avg_t = multi_start_solver(
-                    instance=inst,
-                    algorithm_func=variable_neighborhood_search,
-                    n_restarts=args.restarts, 
-                    grasp_alpha=0.5,
-                    tabu_tenure=args.tenure,
-                    max_iter=dynamic_iter,
-                    candidates_per_iter=args.candidates,
-                    vns_loops=10,
-                    init_strategy=args.init,
-                    pool_size=sn_param
-                )
-                
-                # Si termina antes del timeout:
-                mk = f"{avg_mk:.1f}"
-                t = f"{avg_t:.2f}"
-                if lb > 0:
-                    gap = f"{((avg_mk - lb) / lb) * 100:.2f}"
-                else:
-                    gap = "0.00"
-
-            except TimeoutException:
-                print(f"!!! {inst.name:<18} -> Límite de 600s alcanzado. Saltando...")
-            finally:
-                if os.name != 'nt':
-                    signal.alarm(0) # Desactivar la alarma
-
-            # Imprimir y Guardar
-            result_line = f"{inst.name:<22} | {mk:<10} | {t:<10} | {lb:<8.1f} | {gap:<8}"
-            print(result_line)
-            f.write(f"{inst.name},{mk},{t},{lb},{gap}\n")
+    with ResultSink(output_file) as sink:
+
+        def write_row(row):
+            # Imprimir y Guardar (el sink hace flush por registro: las filas llegan según terminan)
+            row['method'] = args.init
+            row['params'] = run_params
+            row['config'] = config_id
+            print_row(row)
+            sink.write(row)
+
+        run_supervised(files, params, args.jobs, write_row)
 
     print("\n" + "="*80)
-    print(f"Proceso finalizado. Resultados en '{output_file}'")
+    print(f"Proceso finalizado. Resultados en '{output_file}' (config {config_id}; resumen: "
+          f"generate_all_csvs.py --results {output_file} --config {config_id})")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
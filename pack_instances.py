@@ -0,0 +1,34 @@
+"""
+Convierte un directorio de instancias JSON a un único archivo binario empaquetado
+(ver src/io_handler.py, sección FORMATO BINARIO EMPAQUETADO).
+
+Uso:
+    python pack_instances.py                       # instances/*.json -> instances.gcsp
+    python pack_instances.py --folder instances --pattern "large_*.json" --out large.gcsp
+"""
+import argparse
+import time
+
+from src.io_handler import convert_json_folder_to_pack, PackedInstances
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Empaqueta instancias JSON en formato binario")
+    parser.add_argument('--folder', type=str, default='instances', help="Directorio con los JSON")
+    parser.add_argument('--pattern', type=str, default='*.json', help="Patrón glob dentro del directorio")
+    parser.add_argument('--out', type=str, default='instances.gcsp', help="Archivo de salida")
+    args = parser.parse_args()
+
+    start = time.time()
+    count = convert_json_folder_to_pack(args.folder, args.out, args.pattern)
+    if count == 0:
+        print(f"AVISO: ningún archivo coincide con '{args.pattern}' en '{args.folder}'.")
+    print(f"{count} instancias empaquetadas en '{args.out}' ({time.time() - start:.2f}s)")
+
+    # Comprobación rápida: el índice se puede leer de vuelta
+    with PackedInstances(args.out) as pack:
+        assert len(pack) == count
+
+
+if __name__ == "__main__":
+    main()
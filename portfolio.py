@@ -0,0 +1,282 @@
+"""
+Portfolio paralelo CP-SAT + VNS sobre una misma instancia.
+
+CP-SAT (8 search workers) y varios procesos VNS arrancan a la vez y publican
+cada mejora en un incumbente compartido (memoria compartida de multiprocessing).
+La ejecución termina cuando CP-SAT demuestra la optimalidad, cuando el
+incumbente de un método alcanza la cota inferior válida para su objetivo
+(src/bounds.compute_lower_bound para el simulador del VNS; la cota clásica
+calculate_lower_bound para el modelo CP-SAT, cuyo óptimo puede quedar por
+debajo de la primera) o cuando se agota el presupuesto. Así cada
+tamaño obtiene el más rápido de los dos: CP-SAT cierra pronto las instancias
+grandes y el VNS encuentra antes las buenas soluciones de las medianas.
+
+Nota: el makespan de CP-SAT es el de su modelo y el del VNS el del simulador
+(src/evaluator.py); son objetivos distintos y no se comparan entre sí. El
+incumbente guarda uno por método y el registro los da por separado:
+'makespan' (VNS, comparable con resultados_{size}.jsonl) y 'cp_makespan'
+(CP-SAT, comparable con resultados_exacto_{size}.jsonl).
+
+Uso:
+    python portfolio.py --size medium --budget 60 --vns_workers 2
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+from exact_solver import GCSP_CP_SAT_Solver, get_sort_key
+from src.algorithms import _run_restart, variable_neighborhood_search, calculate_lower_bound
+from src.bounds import compute_lower_bound
+from src.grid_search import algorithm_kwargs
+from src.io_handler import load_instance_from_json
+from src.results import (ResultSink, make_record, gap_percent, config_hash, completed_instances,
+                         STATUS_OK, STATUS_TIMEOUT)
+
+SOURCES = ('cp-sat', 'vns')
+# Parámetros del VNS de main.py (max_iter = 6 * n * m lo añade algorithm_kwargs)
+VNS_CONFIG = {'alpha': 0.5, 'tenure': 8, 'candidates': 20, 'vns_loops': 10, 'init_strategy': 'grasp'}
+STOP_GRACE = 10 # Segundos para que los procesos paren solos antes de terminarlos
+
+
+# =========================================================
+# INCUMBENTE COMPARTIDO
+# =========================================================
+class SharedIncumbent:
+    """
+    Mejor makespan conocido de cada método (SOURCES), compartido entre procesos.
+
+    Los valores son RawArray/RawValue: leerlos no toma ningún lock, de modo que
+    un proceso terminado a la fuerza nunca deja bloqueados a los demás. Solo
+    offer() toma el lock (comparar y escribir de forma atómica) y el padre no
+    lo usa nunca. Cada mejora se anota también en una Queue de eventos
+    (tiempo, makespan, origen) que el proceso padre vacía para la traza anytime.
+    """
+
+    def __init__(self, lower_bounds: dict = None):
+        self.start = time.time()
+        # Cota inferior del objetivo de cada método: alcanzarla demuestra su óptimo
+        self.lower_bounds = dict.fromkeys(SOURCES, 0.0)
+        self.lower_bounds.update(lower_bounds or {})
+        self._lock = multiprocessing.Lock()
+        self._makespan = multiprocessing.RawArray('d', [float('inf')] * len(SOURCES))
+        self._found_at = multiprocessing.RawArray('d', len(SOURCES))
+        self._cp_bound = multiprocessing.RawValue('d', 0.0)
+        self._optimal = multiprocessing.RawValue('b', False)
+        self._stop = multiprocessing.RawValue('b', False)
+        self.events = multiprocessing.Queue()
+
+    def offer(self, makespan: float, source: str) -> bool:
+        """Propone una solución de 'source'. Devuelve True si mejora el incumbente de ese método."""
+        k = SOURCES.index(source)
+        if makespan >= self._makespan[k]:
+            return False
+        with self._lock:
+            if makespan >= self._makespan[k]:
+                return False
+            found_at = time.time() - self.start
+            self._makespan[k] = makespan
+            self._found_at[k] = found_at
+        self.events.put((found_at, makespan, source))
+        if makespan <= self.lower_bounds[source]:
+            self.request_stop()
+        return True
+
+    def prove_optimal(self, makespan: float) -> None:
+        """CP-SAT ha demostrado la optimalidad: se anota y se para a todos."""
+        self.offer(makespan, 'cp-sat')
+        self._optimal.value = True
+        self._cp_bound.value = makespan
+        self.request_stop()
+
+    def report_bound(self, bound: float) -> None:
+        """Anota la mejor cota de CP-SAT (válida para su modelo)."""
+        self._cp_bound.value = bound
+
+    def request_stop(self) -> None:
+        self._stop.value = True
+
+    def should_stop(self) -> bool:
+        return bool(self._stop.value)
+
+    def snapshot(self) -> dict:
+        """Estado final: {método: (makespan, instante de la mejora) o None}, cota de CP-SAT y optimalidad."""
+        best = {}
+        for k, source in enumerate(SOURCES):
+            found = self._makespan[k] != float('inf')
+            best[source] = (self._makespan[k], self._found_at[k]) if found else None
+        return {
+            'best': best,
+            'cp_bound': self._cp_bound.value or None,
+            'proven_optimal': bool(self._optimal.value),
+        }
+
+
+# =========================================================
+# PROCESOS DEL PORTFOLIO
+# =========================================================
+def _vns_worker(inst, incumbent, deadline, seed, stride):
+    """Arranques GRASP + VNS consecutivos (semillas seed, seed + stride, ...) hasta parar."""
+    kwargs = dict(algorithm_kwargs(VNS_CONFIG, inst), deadline=deadline,
+                  should_stop=incumbent.should_stop,
+                  on_improve=lambda makespan, seq: incumbent.offer(makespan, 'vns'))
+    while not incumbent.should_stop() and time.time() < deadline:
+        _run_restart(inst, variable_neighborhood_search, seed, kwargs)
+        seed += stride
+
+
+def _cp_worker(inst, incumbent, deadline):
+    """CP-SAT con el tiempo que quede; publica cada solución y para al pedirse la parada."""
+    solver = GCSP_CP_SAT_Solver(inst, time_limit=max(1.0, deadline - time.time()))
+    solver.build_model()
+    if incumbent.should_stop():
+        return
+    solver.time_limit = max(1.0, deadline - time.time())
+
+    def on_solution(callback):
+        incumbent.offer(callback.ObjectiveValue(), 'cp-sat')
+        incumbent.report_bound(callback.BestObjectiveBound())
+        if incumbent.should_stop():
+            callback.StopSearch()
+
+    # Sin soluciones nuevas el callback no se ejecuta: un hilo vigila la bandera
+    # (y repite StopSearch por si el aviso llega antes de que empiece Solve)
+    done = threading.Event()
+
+    def watch_stop():
+        while not done.wait(0.2):
+            if incumbent.should_stop() and solver.solver is not None:
+                solver.solver.StopSearch()
+
+    watcher = threading.Thread(target=watch_stop)
+    watcher.start()
+    try:
+        res = solver.solve(on_solution)
+    finally:
+        done.set()
+        watcher.join()
+    if res['status'] == 'OPTIMAL':
+        incumbent.prove_optimal(res['makespan'])
+    elif res['lower_bound'] is not None:
+        incumbent.report_bound(res['lower_bound'])
+
+
+def solve_portfolio(inst, budget: float, vns_workers: int = 2, seed: int = 0) -> dict:
+    """Resuelve una instancia con CP-SAT y 'vns_workers' procesos VNS en paralelo.
+
+    Args:
+        inst: Instancia GCSP.
+        budget: Presupuesto de tiempo real (segundos) del portfolio completo.
+        vns_workers: Procesos VNS (0 = solo CP-SAT).
+        seed: Semilla base; el proceso VNS w usa seed + w, seed + w + vns_workers, ...
+
+    Returns:
+        Diccionario con 'best' {método: (makespan, segundos hasta la mejora) o
+        None}, 'lower_bounds' {método: cota de su objetivo}, 'cp_bound',
+        'proven_optimal' (del modelo CP-SAT), 'time' y 'trace'
+        [(segundos, makespan, origen), ...].
+    """
+    incumbent = SharedIncumbent({'vns': compute_lower_bound(inst), 'cp-sat': calculate_lower_bound(inst)})
+    deadline = incumbent.start + budget
+    processes = [multiprocessing.Process(target=_cp_worker, args=(inst, incumbent, deadline))]
+    processes += [multiprocessing.Process(target=_vns_worker, args=(inst, incumbent, deadline, seed + w, vns_workers))
+                  for w in range(vns_workers)]
+    for p in processes:
+        p.start()
+
+    # El padre vacía la Queue de eventos mientras espera (si no, los hijos no terminan)
+    trace = []
+    while time.time() < deadline and not incumbent.should_stop() and any(p.is_alive() for p in processes):
+        try:
+            trace.append(incumbent.events.get(timeout=min(0.2, max(0.01, deadline - time.time()))))
+        except queue.Empty:
+            pass
+    incumbent.request_stop()
+
+    grace_end = time.time() + STOP_GRACE
+    while any(p.is_alive() for p in processes) and time.time() < grace_end:
+        try:
+            trace.append(incumbent.events.get(timeout=0.1))
+        except queue.Empty:
+            pass
+    for p in processes:
+        if p.is_alive():
+            p.terminate()
+        p.join()
+    while True:
+        try:
+            trace.append(incumbent.events.get_nowait())
+        except queue.Empty:
+            break
+
+    result = incumbent.snapshot()
+    result['lower_bounds'] = dict(incumbent.lower_bounds)
+    result['time'] = time.time() - incumbent.start
+    result['trace'] = sorted(trace)
+    return result
+
+
+# =========================================================
+# MAIN
+# =========================================================
+def main():
+    parser = argparse.ArgumentParser(description="Portfolio paralelo CP-SAT + VNS con incumbente compartido")
+    parser.add_argument('--size', type=str, required=True, choices=['small', 'medium', 'large'])
+    parser.add_argument('--budget', type=float, default=600, help="Segundos por instancia (default: 600)")
+    parser.add_argument('--vns_workers', type=int, default=2, help="Procesos VNS junto a CP-SAT")
+    parser.add_argument('--seed', type=int, default=0, help="Semilla base de los procesos VNS")
+    parser.add_argument('--resume', action='store_true',
+                        help="Saltar las instancias que ya tienen resultado con la misma configuración")
+    args = parser.parse_args()
+
+    files = sorted(glob.glob(f"instances/{args.size}_*.json"), key=get_sort_key)
+    if not files:
+        print("No se encontraron instancias.")
+        return
+
+    out_file = f"resultados_portfolio_{args.size}.jsonl"
+    # 'lb' identifica la cota del GAP: registros con otra cota no comparten huella
+    config = {'budget': args.budget, 'vns_workers': args.vns_workers, 'seed': args.seed,
+              'lb': 'compute_lower_bound'}
+    config_id = config_hash(config)
+    if args.resume:
+        done = completed_instances(out_file, config_id)
+        files = [fp for fp in files if os.path.splitext(os.path.basename(fp))[0] not in done]
+        print(f"Reanudando (config {config_id}): {len(done)} instancias ya resueltas, {len(files)} pendientes.")
+
+    print(f"\n{'='*90}")
+    print(f" PORTFOLIO CP-SAT + {args.vns_workers} VNS | SIZE: {args.size.upper()} | BUDGET: {args.budget}s/instancia")
+    print(f"{'='*90}")
+    print(f"{'Instancia':<22} | {'VNS':<8} | {'t VNS':<7} | {'CP-SAT':<8} | {'t CP':<7} | {'Time':<8} | {'Óptimo CP'}")
+    print("-" * 90)
+
+    def cells(best):
+        """(makespan, instante) de un método como texto de la tabla."""
+        return (f"{best[0]:.1f}", f"{best[1]:.2f}") if best is not None else ("-", "-")
+
+    with ResultSink(out_file) as sink:
+        for filepath in files:
+            inst = load_instance_from_json(filepath)
+            res = solve_portfolio(inst, args.budget, args.vns_workers, args.seed)
+            lb, cp_lb = res['lower_bounds']['vns'], res['lower_bounds']['cp-sat']
+            vns, cp = res['best']['vns'], res['best']['cp-sat']
+            (vns_mk, vns_t), (cp_mk, cp_t) = cells(vns), cells(cp)
+            print(f"{inst.name:<22} | {vns_mk:<8} | {vns_t:<7} | {cp_mk:<8} | {cp_t:<7} | "
+                  f"{res['time']:<8.2f} | {'sí' if res['proven_optimal'] else 'no'}")
+            # 'makespan' es el del simulador (VNS); el de CP-SAT va aparte, con su propio objetivo y cota
+            makespan = vns[0] if vns else None
+            cp_makespan = cp[0] if cp else None
+            sink.write(make_record('portfolio', inst.name, STATUS_OK if vns else STATUS_TIMEOUT, makespan,
+                                   res['time'], lb, gap_percent(makespan, lb), config=config_id, params=config,
+                                   vns_time=vns[1] if vns else None,
+                                   cp_makespan=cp_makespan, cp_time=cp[1] if cp else None,
+                                   cp_lb=cp_lb, cp_gap=gap_percent(cp_makespan, cp_lb),
+                                   cp_bound=res['cp_bound'], proven_optimal=res['proven_optimal'],
+                                   trace=res['trace']))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,10 @@ import math
 import random
 import copy
 import time
+import multiprocessing
+from collections import deque
+from src.evaluator import get_evaluator, MakespanCache
+from src.profiling import SolverProfile
 
 # =========================================================
 # 0. CÁLCULO DE COTAS (NUEVO)
@@ -30,62 +34,10 @@ def calculate_lower_bound(instance):
 def calculate_makespan(instance, task_sequence_ids):
     """
     Calcula el makespan de una secuencia de tareas.
+    Delegamos en el evaluador compilado de la instancia (ver src/evaluator.py),
+    que se construye una sola vez y reutiliza sus buffers entre llamadas.
     """
-    task_map_by_id = {t.id: t for t in instance.tasks}
-    n = len(instance.tasks)
-    m = len(instance.cranes)
-    
-    # Estado inicial
-    cranes_pos = [0] + [c.location for c in instance.cranes] + [n + 1]
-    cranes_avail_time = [float('inf')] + [0.0] * m + [float('inf')]
-    tasks_completion_by_loc = [0.0] * (n + 2) 
-
-    for task_id in task_sequence_ids:
-        task = task_map_by_id[task_id]
-        target_loc = task.location
-        
-        # Selección de grúa (Lógica Greedy por tiempo disponible)
-        selected_crane_idx = -1
-        for j in range(len(cranes_pos) - 1):
-            if cranes_pos[j] <= target_loc <= cranes_pos[j+1]:
-                if cranes_avail_time[j] < cranes_avail_time[j+1]:
-                    selected_crane_idx = j
-                elif cranes_avail_time[j] > cranes_avail_time[j+1]:
-                    selected_crane_idx = j + 1
-                else:
-                    # Desempate por distancia
-                    dist_j = abs(cranes_pos[j] - target_loc)
-                    dist_j1 = abs(cranes_pos[j+1] - target_loc)
-                    selected_crane_idx = j if dist_j <= dist_j1 else j + 1
-                break
-        
-        # Corrección de seguridad
-        if selected_crane_idx == 0: selected_crane_idx = 1
-        if selected_crane_idx == m + 1: selected_crane_idx = m
-        
-        # Cálculo de tiempos
-        k = selected_crane_idx
-        current_loc = cranes_pos[k]
-        
-        min_path = min(current_loc, target_loc)
-        max_path = max(current_loc, target_loc)
-        
-        # Bloqueo por interferencias en el trayecto
-        max_block_time = 0.0
-        for loc in range(min_path, max_path + 1):
-            if tasks_completion_by_loc[loc] > max_block_time:
-                max_block_time = tasks_completion_by_loc[loc]
-        
-        travel_time = abs(current_loc - target_loc) * instance.t_0
-        start_time = max(max_block_time, cranes_avail_time[k])
-        finish_time = start_time + task.p_0 + travel_time
-        
-        # Actualizar estado
-        cranes_pos[k] = target_loc
-        cranes_avail_time[k] = finish_time
-        tasks_completion_by_loc[target_loc] = finish_time
-
-    return max(tasks_completion_by_loc)
+    return get_evaluator(instance).evaluate(task_sequence_ids)
 
 
 # =========================================================
@@ -109,24 +61,37 @@ def apply_invert(sequence, i, j):
     new_seq[start:end+1] = new_seq[start:end+1][::-1]
     return new_seq
 
-def get_random_neighbor_specific(sequence, move_type):
-    """Genera un vecino específico para el VNS."""
+def get_random_move(sequence, move_type):
+    """
+    Genera un vecino aleatorio del tipo indicado.
+    Devuelve (vecino, i, j) con i <= j las posiciones extremas del movimiento:
+    el prefijo sequence[:i] es común, lo que permite la evaluación incremental.
+    Si no hay movimiento posible se devuelve i = j = len(sequence).
+    """
     n = len(sequence)
-    if n < 2: return sequence[:]
+    if n < 2: return sequence[:], n, n
     idxs = random.sample(range(n), 2)
     i, j = min(idxs), max(idxs)
     
-    if move_type == 'swap': return apply_swap(sequence, i, j)
-    elif move_type == 'insert': return apply_insert(sequence, i, j)
-    elif move_type == 'invert': return apply_invert(sequence, i, j)
-    return sequence[:]
+    if move_type == 'swap': return apply_swap(sequence, i, j), i, j
+    elif move_type == 'insert': return apply_insert(sequence, i, j), i, j
+    elif move_type == 'invert': return apply_invert(sequence, i, j), i, j
+    return sequence[:], n, n
 
-def get_neighbor(sequence, method="random"):
-    """Genérico para Tabu Search (conservado por compatibilidad)."""
+def get_random_neighbor_specific(sequence, move_type):
+    """Genera un vecino específico para el VNS."""
+    return get_random_move(sequence, move_type)[0]
+
+def get_neighbor_move(sequence, method="random"):
+    """Como get_neighbor, pero devuelve también las posiciones (i, j) del movimiento."""
     if method == "random":
         r = random.random()
         method = "swap" if r < 0.33 else ("insert" if r < 0.66 else "invert")
-    return get_random_neighbor_specific(sequence, method)
+    return get_random_move(sequence, method)
+
+def get_neighbor(sequence, method="random"):
+    """Genérico para Tabu Search (conservado por compatibilidad)."""
+    return get_neighbor_move(sequence, method)[0]
 
 
 # =========================================================
@@ -137,40 +102,77 @@ def construct_random_solution(instance):
     """
     Genera una solución inicial aleatoria (permutación simple).
     """
-    seq = [t.id for t in instance.tasks]
+    seq = instance.arrays.ids.tolist()
     random.shuffle(seq)
     return seq
 
 def construct_grasp_solution(instance, alpha=0.5):
-    candidates = [t for t in instance.tasks]
+    """
+    Constructor GRASP con costes incrementales.
+    El coste de una tarea es el menor tiempo de fin entre todas las grúas. En cada
+    paso solo cambia el estado de la grúa elegida, y su tiempo de fin para
+    cualquier tarea no puede bajar (desigualdad triangular), así que:
+        - solo se recalcula la columna de esa grúa en la caché finish[grúa][tarea];
+        - solo se vuelve a buscar la mejor grúa de las tareas cuya mejor grúa era ella.
+    La RCL se rellena en un buffer preasignado. El resultado (y el consumo del
+    generador aleatorio) es idéntico al del constructor original.
+    """
+    arrays = instance.arrays
+    ids = arrays.ids
+    n = len(ids)
+    m = len(arrays.crane_ids)
+    locs = arrays.locations.tolist()
+    p0s = arrays.p_0.tolist()
+    crane_loc = arrays.crane_locations.tolist()
+    crane_time = [0.0] * m
+
+    # Caché de tiempos de fin por (grúa, tarea) y mejor grúa de cada tarea
+    finish = [[(crane_time[c] + abs(crane_loc[c] - locs[t])) + p0s[t] for t in range(n)]
+              for c in range(m)]
+    best_cost = [float('inf')] * n
+    best_crane = [-1] * n
+    for t in range(n):
+        for c in range(m):
+            if finish[c][t] < best_cost[t]:
+                best_cost[t] = finish[c][t]
+                best_crane[t] = c
+
+    remaining = list(range(n)) # Índices de tareas pendientes, en el orden original
+    rcl = [0] * n              # Buffer preasignado para la RCL
     solution_seq = []
-    crane_states = {c.id: {'loc': c.location, 'time': 0.0} for c in instance.cranes}
-
-    while candidates:
-        scored_candidates = []
-        for task in candidates:
-            best_finish = float('inf')
-            best_crane = -1
-            for c_id, state in crane_states.items():
-                dist = abs(state['loc'] - task.location)
-                arrival = state['time'] + dist
-                finish = arrival + task.p_0
-                if finish < best_finish:
-                    best_finish = finish
-                    best_crane = c_id
-            scored_candidates.append({'task': task, 'cost': best_finish, 'crane': best_crane})
-
-        costs = [x['cost'] for x in scored_candidates]
-        min_c, max_c = min(costs), max(costs)
+
+    while remaining:
+        min_c = max_c = best_cost[remaining[0]]
+        for t in remaining:
+            cost = best_cost[t]
+            if cost < min_c: min_c = cost
+            elif cost > max_c: max_c = cost
         threshold = min_c + alpha * (max_c - min_c)
-        rcl = [x for x in scored_candidates if x['cost'] <= threshold]
-        
-        selection = random.choice(rcl)
-        task = selection['task']
-        solution_seq.append(task.id)
-        candidates.remove(task)
-        crane_states[selection['crane']]['loc'] = task.location
-        crane_states[selection['crane']]['time'] = selection['cost']
+
+        count = 0
+        for t in remaining:
+            if best_cost[t] <= threshold:
+                rcl[count] = t
+                count += 1
+
+        # Equivale a random.choice(rcl[:count]) sin crear la lista
+        task = rcl[random.randrange(count)]
+        solution_seq.append(ids[task])
+        remaining.remove(task)
+
+        # Solo cambia la grúa elegida: actualizar su estado y su columna
+        c = best_crane[task]
+        crane_loc[c] = locs[task]
+        crane_time[c] = best_cost[task]
+        row = finish[c]
+        for t in remaining:
+            row[t] = (crane_time[c] + abs(crane_loc[c] - locs[t])) + p0s[t]
+            if best_crane[t] == c:
+                best_cost[t] = float('inf')
+                for k in range(m):
+                    if finish[k][t] < best_cost[t]:
+                        best_cost[t] = finish[k][t]
+                        best_crane[t] = k
         
     return solution_seq
 
@@ -178,60 +180,319 @@ def construct_grasp_solution(instance, alpha=0.5):
 # 4. ALGORITMOS (Tabu & VNS)
 # =========================================================
 
+def _resolve_deadline(kwargs):
+    """
+    Instante (time.time()) en el que la búsqueda debe parar, o None si no hay límite.
+    'deadline' es absoluto; 'time_budget' son segundos contados desde ahora.
+    """
+    deadline = kwargs.get('deadline')
+    if deadline is None and kwargs.get('time_budget') is not None:
+        deadline = time.time() + kwargs['time_budget']
+    return deadline
+
+
+class TabuMemory:
+    """
+    Memoria tabú FIFO con pertenencia O(1).
+    Guarda los atributos de los últimos 'tenure' movimientos en una cola (para
+    caducarlos en orden) y un contador por atributo (para consultar en O(1)).
+    Un mismo atributo puede estar en varios movimientos: solo deja de ser tabú
+    cuando caduca su última aparición.
+    """
+    def __init__(self, tenure):
+        self.tenure = tenure
+        self.fifo = deque()
+        self.counts = {}
+
+    def push(self, attributes):
+        """Añade los atributos de un movimiento y caduca el más antiguo si sobra."""
+        self.fifo.append(attributes)
+        for a in attributes:
+            self.counts[a] = self.counts.get(a, 0) + 1
+        if len(self.fifo) > self.tenure:
+            for a in self.fifo.popleft():
+                c = self.counts[a] - 1
+                if c: self.counts[a] = c
+                else: del self.counts[a]
+
+    def __contains__(self, attribute):
+        return attribute in self.counts
+
+
+def _move_attributes(sequence, i, j):
+    """Atributos (tarea, posición) de los extremos de un movimiento sobre 'sequence'."""
+    if i >= len(sequence): return ()
+    return ((sequence[i], i), (sequence[j], j))
+
+
+def _sweep_neighborhood(evaluator, checkpoints, current_seq, tabu_list, by_attributes, best_makespan):
+    """
+    Recorre el vecindario completo: swap, insert e invert para todo i < j (sin
+    repetir los insert/invert de posiciones contiguas, que equivalen a un swap).
+    Los movimientos se aplican y deshacen sobre una única copia de trabajo, y cada
+    vecino se evalúa de forma incremental con poda: se abandona en cuanto su
+    makespan parcial alcanza al mejor candidato admisible (o, si es tabú, al
+    mejor global, que es lo único que permitiría la aspiración).
+    Devuelve (mejor vecino, (i, j), makespan, nº de evaluaciones, vecinos tabú,
+    vecinos tabú que mejoran al mejor global, es decir, aspiraciones).
+    """
+    n = len(current_seq)
+    work = current_seq[:]
+    best_candidate_seq = None
+    best_candidate_move = None
+    best_candidate_makespan = float('inf')
+    evaluations = tabu_hits = aspiration_hits = 0
+
+    for move_type in ('swap', 'insert', 'invert'):
+        for i in range(n - 1):
+            for j in range(i + 1, n):
+                if move_type != 'swap' and j == i + 1:
+                    continue
+
+                # Aplicar el movimiento in situ
+                if move_type == 'swap':
+                    work[i], work[j] = work[j], work[i]
+                elif move_type == 'insert':
+                    work.insert(i, work.pop(j))
+                else:
+                    work[i:j + 1] = work[i:j + 1][::-1]
+
+                # Criterios Tabú y Aspiración -> cota de poda
+                if by_attributes:
+                    is_tabu = any(a in tabu_list for a in _move_attributes(work, i, j))
+                else:
+                    is_tabu = tuple(work) in tabu_list
+                cutoff = best_candidate_makespan
+                if is_tabu and best_makespan < cutoff:
+                    cutoff = best_makespan
+
+                neighbor_makespan = evaluator.evaluate_from(checkpoints, work, i, cutoff)
+                evaluations += 1
+                if is_tabu:
+                    # Un valor >= cutoff puede ser parcial (evaluación podada): solo
+                    # cuenta como aspiración un makespan completo (< cutoff) que
+                    # además mejora al mejor global
+                    tabu_hits += 1
+                    aspiration_hits += neighbor_makespan < cutoff and neighbor_makespan < best_makespan
+                if neighbor_makespan < cutoff:
+                    best_candidate_makespan = neighbor_makespan
+                    best_candidate_seq = work[:]
+                    best_candidate_move = (i, j)
+
+                # Deshacer
+                if move_type == 'swap':
+                    work[i], work[j] = work[j], work[i]
+                elif move_type == 'insert':
+                    work.insert(j, work.pop(i))
+                else:
+                    work[i:j + 1] = work[i:j + 1][::-1]
+
+    return (best_candidate_seq, best_candidate_move, best_candidate_makespan, evaluations,
+            tabu_hits, aspiration_hits)
+
+
+def _record_eval_stats(stats, evaluations, seconds):
+    """Acumula evaluaciones y tiempo en el dict 'stats' y actualiza evals_per_sec."""
+    stats['evaluations'] = stats.get('evaluations', 0) + evaluations
+    stats['seconds'] = stats.get('seconds', 0.0) + seconds
+    if stats['seconds'] > 0:
+        stats['evals_per_sec'] = stats['evaluations'] / stats['seconds']
+
+
+def _record_profile(profile, **counters):
+    """Suma varios contadores de una vez a un SolverProfile."""
+    for name, n in counters.items():
+        profile.count(name, n)
+
+
 def tabu_search(instance, initial_sequence, tabu_tenure=8, max_iter=100, candidates_per_iter=20, **kwargs):
     """
     Búsqueda Tabú (Usada como Local Search dentro del VNS).
+    Con incremental_eval=True (por defecto) los vecinos se evalúan reanudando
+    la simulación desde la primera posición modificada respecto a la solución
+    actual, en lugar de repetir la secuencia entera.
+    Con batch_eval=True los 'candidates_per_iter' vecinos se evalúan de una vez
+    con NumPy (evaluate_batch); compensa con muchos candidatos por iteración.
+    La memoria tabú (tabu_memory) admite dos modos, ambos con consulta O(1):
+        - 'solution': las últimas 'tabu_tenure' soluciones visitadas (por defecto).
+        - 'attributes': prohíbe durante 'tabu_tenure' movimientos devolver una
+          tarea a la posición que acaba de abandonar (atributos (tarea, posición)
+          de los extremos i, j de cada movimiento aceptado).
+    Modo anytime: con 'deadline'/'time_budget' la búsqueda para al agotar el
+    tiempo y devuelve su mejor solución. El tercer elemento devuelto es la traza
+    de mejoras [(segundos desde 'trace_origin', makespan), ...].
+    Exploración del vecindario (neighborhood):
+        - 'sampled': 'candidates_per_iter' vecinos aleatorios (por defecto).
+        - 'sweep': vecindario completo O(n^2) con evaluación incremental y poda
+          (ver _sweep_neighborhood); ignora 'candidates_per_iter'.
+    Si se pasa un dict 'stats', se acumulan en él 'evaluations', 'seconds' y
+    'evals_per_sec' para comparar ambos modos a igualdad de tiempo.
+    Si se pasa 'memo_cache' (MakespanCache), las evaluaciones pasan por ella.
+    Ganchos para ejecutores externos (p. ej. el portfolio de portfolio.py):
+        - on_improve(makespan, secuencia): se llama con la solución inicial y
+          con cada nueva mejor solución.
+        - should_stop(): se consulta junto al 'deadline'; si devuelve True la
+          búsqueda para y devuelve su mejor solución.
+    Con 'lower_bound' (p. ej. src/bounds.compute_lower_bound) la búsqueda para
+    en cuanto la mejor solución alcanza la cota: ya es óptima.
+    Con 'profile' (src/profiling.SolverProfile) se acumulan iteraciones,
+    evaluaciones, movimientos aceptados, vecinos tabú, aspiraciones y mejoras,
+    y el tiempo de las fases neighbors/evaluation/bookkeeping. Sin él los
+    contadores son enteros locales y no se toma ningún tiempo.
     """
+    deadline = _resolve_deadline(kwargs)
+    on_improve = kwargs.get('on_improve')
+    should_stop = kwargs.get('should_stop')
+    lower_bound = kwargs.get('lower_bound')
+    origin = kwargs.get('trace_origin') or time.time()
+    memory_mode = kwargs.get('tabu_memory', 'solution')
+    sweep = kwargs.get('neighborhood', 'sampled') == 'sweep'
+    batch = kwargs.get('batch_eval', False) and not sweep
+    incremental = (kwargs.get('incremental_eval', True) or sweep) and not batch
+    stats = kwargs.get('stats')
+    profile = kwargs.get('profile')
+    profiling = profile is not None
+    start_t = time.time()
+    evaluations = 1
+    iterations = accepted_moves = tabu_hits = aspiration_hits = improvements = 0
+    t_neighbors = t_evaluation = t_bookkeeping = 0.0
+    evaluator = kwargs.get('memo_cache') or get_evaluator(instance)
     current_seq = initial_sequence[:]
-    current_makespan = calculate_makespan(instance, current_seq)
+    if incremental:
+        checkpoints = evaluator.checkpoint(current_seq)
+        current_makespan = checkpoints.makespan
+    else:
+        current_makespan = evaluator.evaluate(current_seq)
     
     best_seq = current_seq[:]
     best_makespan = current_makespan
     
-    tabu_list = []
+    tabu_list = TabuMemory(tabu_tenure)
+    by_attributes = memory_mode == 'attributes'
+    trace = [(time.time() - origin, best_makespan)]
+    if on_improve is not None:
+        on_improve(best_makespan, best_seq)
     
     for _ in range(max_iter):
+        if deadline is not None and time.time() >= deadline:
+            break
+        if should_stop is not None and should_stop():
+            break
+        if lower_bound is not None and best_makespan <= lower_bound:
+            break
+        
+        iterations += 1
         best_candidate_seq = None
+        best_candidate_move = None
         best_candidate_makespan = float('inf')
         
         # Evaluar vecindario
-        for _ in range(candidates_per_iter):
-            neighbor = get_neighbor(current_seq, method="random")
-            neighbor_makespan = calculate_makespan(instance, neighbor)
+        if sweep:
+            if profiling:
+                t1 = time.perf_counter()
+            (best_candidate_seq, best_candidate_move, best_candidate_makespan, n_evals,
+             n_tabu, n_aspiration) = _sweep_neighborhood(
+                evaluator, checkpoints, current_seq, tabu_list, by_attributes, best_makespan)
+            evaluations += n_evals
+            tabu_hits += n_tabu
+            aspiration_hits += n_aspiration
+            if profiling:
+                # El barrido genera, evalúa y filtra a la vez: todo cuenta como evaluación
+                t0 = time.perf_counter()
+                t_evaluation += t0 - t1
+        else:
+            if profiling:
+                t0 = time.perf_counter()
+            neighbors = [get_neighbor_move(current_seq, method="random") for _ in range(candidates_per_iter)]
+            evaluations += len(neighbors)
+            if profiling:
+                t1 = time.perf_counter()
+                t_neighbors += t1 - t0
+            if batch:
+                makespans = evaluator.evaluate_batch([nb for nb, _, _ in neighbors]).tolist()
+            elif incremental:
+                makespans = [evaluator.evaluate_from(checkpoints, nb, i) for nb, i, _ in neighbors]
+            else:
+                makespans = [evaluator.evaluate(nb) for nb, _, _ in neighbors]
+            if profiling:
+                t0 = time.perf_counter()
+                t_evaluation += t0 - t1
             
-            # Criterios Tabú y Aspiración
-            is_tabu = tuple(neighbor) in tabu_list
-            is_aspiration = neighbor_makespan < best_makespan
+            for (neighbor, i, j), neighbor_makespan in zip(neighbors, makespans):
+                # Criterios Tabú y Aspiración
+                if by_attributes:
+                    is_tabu = any(a in tabu_list for a in _move_attributes(neighbor, i, j))
+                else:
+                    is_tabu = tuple(neighbor) in tabu_list
+                is_aspiration = neighbor_makespan < best_makespan
+                if profiling and is_tabu:
+                    tabu_hits += 1
+                    aspiration_hits += is_aspiration
             
-            if (not is_tabu) or is_aspiration:
-                if neighbor_makespan < best_candidate_makespan:
-                    best_candidate_makespan = neighbor_makespan
-                    best_candidate_seq = neighbor
+                if (not is_tabu) or is_aspiration:
+                    if neighbor_makespan < best_candidate_makespan:
+                        best_candidate_makespan = neighbor_makespan
+                        best_candidate_seq = neighbor
+                        best_candidate_move = (i, j)
         
         # Movimiento
         if best_candidate_seq:
+            accepted_moves += 1
+            if by_attributes:
+                # Lo tabú es devolver las tareas movidas a la posición que dejan
+                tabu_list.push(_move_attributes(current_seq, *best_candidate_move))
             current_seq = best_candidate_seq
             current_makespan = best_candidate_makespan
+            if incremental:
+                checkpoints = evaluator.checkpoint(current_seq)
             
             if current_makespan < best_makespan:
                 best_makespan = current_makespan
                 best_seq = current_seq[:]
+                improvements += 1
+                trace.append((time.time() - origin, best_makespan))
+                if on_improve is not None:
+                    on_improve(best_makespan, best_seq)
             
-            tabu_list.append(tuple(current_seq))
-            if len(tabu_list) > tabu_tenure:
-                tabu_list.pop(0)
+            if not by_attributes:
+                tabu_list.push((tuple(current_seq),))
+        if profiling:
+            t_bookkeeping += time.perf_counter() - t0
+    
+    if stats is not None:
+        _record_eval_stats(stats, evaluations, time.time() - start_t)
+    if profiling:
+        _record_profile(profile, tabu_runs=1, iterations=iterations, evaluations=evaluations,
+                        accepted_moves=accepted_moves, tabu_hits=tabu_hits, aspiration_hits=aspiration_hits,
+                        improvements=improvements)
+        profile.add_time('neighbors', t_neighbors)
+        profile.add_time('evaluation', t_evaluation)
+        profile.add_time('bookkeeping', t_bookkeeping)
                 
-    return best_seq, best_makespan, []
+    return best_seq, best_makespan, trace
 
 
 def variable_neighborhood_search(instance, initial_seq, **kwargs):
     """
     VNS Híbrido: Director (VNS) + Obrero (Tabu Search).
+    Con 'deadline'/'time_budget' para limpiamente al agotar el tiempo (también
+    dentro del Tabu) y devuelve la mejor solución encontrada hasta entonces.
+    El tercer elemento devuelto es la traza de mejoras [(segundos, makespan), ...].
+    Los ganchos 'on_improve' y 'should_stop' llegan al Tabu (ver tabu_search);
+    'should_stop' también corta el bucle VNS, igual que alcanzar 'lower_bound'.
+    Con 'profile' se cuentan además las agitaciones y las mejoras de cada
+    vecindario (shakes.<tipo>, improvements.<tipo>).
     """
     neighborhoods = ['swap', 'insert', 'invert']
+    deadline = _resolve_deadline(kwargs)
+    should_stop = kwargs.get('should_stop')
+    profile = kwargs.get('profile')
+    lower_bound = kwargs.get('lower_bound')
+    origin = kwargs.get('trace_origin') or time.time()
+    tabu_kwargs = dict(kwargs, deadline=deadline, trace_origin=origin)
     
     # 1. Punto de partida (Refinado una vez con Tabu)
-    current_seq, current_makespan, _ = tabu_search(instance, initial_seq, **kwargs)
+    current_seq, current_makespan, trace = tabu_search(instance, initial_seq, **tabu_kwargs)
     
     best_seq = current_seq[:]
     best_makespan = current_makespan
@@ -243,19 +504,33 @@ def variable_neighborhood_search(instance, initial_seq, **kwargs):
     loop_count = 0
     
     while k < len(neighborhoods) and loop_count < max_vns_loops:
+        if deadline is not None and time.time() >= deadline:
+            break
+        if should_stop is not None and should_stop():
+            break
+        if lower_bound is not None and best_makespan <= lower_bound:
+            break
+        
         move_type = neighborhoods[k]
         
         # A. Shaking (Agitación)
         shaking_seq = get_random_neighbor_specific(current_seq, move_type)
+        if profile is not None:
+            profile.count('shakes.' + move_type)
         
         # B. Local Search (Intensificación con Tabu)
-        improved_seq, improved_val, _ = tabu_search(instance, shaking_seq, **kwargs)
+        improved_seq, improved_val, tabu_trace = tabu_search(instance, shaking_seq, **tabu_kwargs)
+        for t, mk in tabu_trace:
+            if mk < trace[-1][1]:
+                trace.append((t, mk))
         
         # C. Cambio de Vecindario
         if improved_val < current_makespan:
             # Mejora -> Nos movemos y reiniciamos a Swap (k=0)
             current_makespan = improved_val
             current_seq = improved_seq[:]
+            if profile is not None:
+                profile.count('improvements.' + move_type)
             
             if current_makespan < best_makespan:
                 best_makespan = current_makespan
@@ -268,64 +543,178 @@ def variable_neighborhood_search(instance, initial_seq, **kwargs):
             k += 1
             loop_count += 1
             
-    return best_seq, best_makespan, []
+    return best_seq, best_makespan, trace
 
 
 # =========================================================
 # 5. ESTRATEGIA MULTI-ARRANQUE
 # =========================================================
 
-def multi_start_solver(instance, algorithm_func, n_restarts=5, **kwargs):
+# Caché memo de un proceso hijo del Pool de multi_start_solver (None en el padre)
+_worker_memo_cache = None
+
+
+def _init_restart_worker(instance, memo_mb):
+    """Inicializador del Pool: cada proceso crea su caché memo, compartida por sus arranques."""
+    global _worker_memo_cache
+    _worker_memo_cache = MakespanCache(get_evaluator(instance), max_mb=memo_mb) if memo_mb else None
+
+
+def _run_restart(instance, algorithm_func, seed, kwargs, first=True):
     """
-    Ejecuta el algoritmo 'n_restarts' veces.
-    Soporta init_strategy: 
-        - 'grasp': Construcción inteligente.
-        - 'random': Genera 'pool_size' aleatorias y elige la mejor (Best of SN).
+    Ejecuta un arranque completo (construcción + mejora).
+    Si se indica 'seed', el generador aleatorio se re-siembra antes de empezar,
+    de modo que el arranque es reproducible tanto en serie como en un proceso hijo.
+    Devuelve (secuencia, makespan, tiempo), o None si el arranque empieza con
+    el 'deadline' ya vencido y no es el primero (no aportaría nada a la media).
+    Con 'profile' en kwargs se anotan el arranque y el tiempo de construcción
+    y de mejora. En un proceso hijo con 'memo_mb', las evaluaciones pasan por
+    la caché memo del proceso (ver _init_restart_worker).
     """
-    
+    if _worker_memo_cache is not None and 'memo_cache' not in kwargs:
+        kwargs = dict(kwargs, memo_cache=_worker_memo_cache)
+    deadline = kwargs.get('deadline')
+    if not first and deadline is not None and time.time() >= deadline:
+        return None
+    if seed is not None:
+        random.seed(seed)
+
     init_strategy = kwargs.get('init_strategy', 'grasp')
     alpha = kwargs.get('grasp_alpha', 0.5)
     pool_size = kwargs.get('pool_size', 1) # SN (Swarm Number) para Random
 
-    results_makespan = []
-    results_time = []
+    start_t = time.time()
     
-    best_global_makespan = float('inf')
-    best_global_seq = []
-
-    for i in range(n_restarts):
-        start_t = time.time()
+    # 1. Construcción
+    if init_strategy == 'random':
+        # ESTRATEGIA: Best of SN (Población Aleatoria)
+        best_rand_sol = None
+        best_rand_val = float('inf')
         
-        # 1. Construcción
-        if init_strategy == 'random':
-            # ESTRATEGIA: Best of SN (Población Aleatoria)
-            best_rand_sol = None
-            best_rand_val = float('inf')
-            
-            # Generamos 'pool_size' soluciones y nos quedamos la mejor
-            for _ in range(pool_size):
-                cand = construct_random_solution(instance)
-                val = calculate_makespan(instance, cand)
-                if val < best_rand_val:
-                    best_rand_val = val
-                    best_rand_sol = cand[:]
-            
-            initial_sol = best_rand_sol
-            
-        else: 
-            # ESTRATEGIA: GRASP
-            current_alpha = alpha if isinstance(alpha, float) else random.uniform(0.1, 0.9)
-            initial_sol = construct_grasp_solution(instance, alpha=current_alpha)
-        
-        # 2. Mejora (VNS + Tabu)
-        sol, val, _ = algorithm_func(instance, initial_sol, **kwargs)
+        # Generamos 'pool_size' soluciones y nos quedamos la mejor
+        evaluator = get_evaluator(instance)
+        pool = [construct_random_solution(instance) for _ in range(pool_size)]
+        if kwargs.get('batch_eval', False):
+            pool_values = evaluator.evaluate_batch(pool).tolist()
+        else:
+            pool_values = [evaluator.evaluate(cand) for cand in pool]
+        for cand, val in zip(pool, pool_values):
+            if val < best_rand_val:
+                best_rand_val = val
+                best_rand_sol = cand[:]
         
-        end_t = time.time()
-        elapsed = end_t - start_t
+        initial_sol = best_rand_sol
         
-        results_makespan.append(val)
-        results_time.append(elapsed)
+    else: 
+        # ESTRATEGIA: GRASP
+        current_alpha = alpha if isinstance(alpha, float) else random.uniform(0.1, 0.9)
+        initial_sol = construct_grasp_solution(instance, alpha=current_alpha)
+    built_t = time.time()
+    
+    # 2. Mejora (VNS + Tabu)
+    sol, val, _ = algorithm_func(instance, initial_sol, **kwargs)
+    
+    end_t = time.time()
+    profile = kwargs.get('profile')
+    if profile is not None:
+        profile.count('restarts')
+        profile.add_time('construction', built_t - start_t)
+        profile.add_time('improvement', end_t - built_t)
+    return sol, val, end_t - start_t
+
+
+def _run_restart_profiled(instance, algorithm_func, seed, kwargs, first=True):
+    """_run_restart en un proceso hijo con su propio perfil: devuelve (arranque, perfil)."""
+    profile = SolverProfile()
+    return _run_restart(instance, algorithm_func, seed, dict(kwargs, profile=profile), first), profile
+
 
+def _reached_bound(restart, lower_bound):
+    """¿El arranque (secuencia, makespan, tiempo) ha alcanzado la cota inferior?"""
+    return lower_bound is not None and restart is not None and restart[1] <= lower_bound
+
+
+def multi_start_solver(instance, algorithm_func, n_restarts=5, **kwargs):
+    """
+    Ejecuta el algoritmo 'n_restarts' veces.
+    Soporta init_strategy: 
+        - 'grasp': Construcción inteligente.
+        - 'random': Genera 'pool_size' aleatorias y elige la mejor (Best of SN).
+    Paralelismo (los arranques son independientes):
+        - workers: Nº de procesos (1 = en serie, comportamiento original).
+        - seed: Semilla base; el arranque i usa seed + i. Con la misma semilla
+          el resultado es idéntico en serie y en paralelo. Si se usan varios
+          procesos sin semilla, la base se extrae del generador global.
+        - return_restart_times: Si es True se devuelve además la lista con el
+          tiempo de cada arranque.
+    Límite de tiempo (anytime): 'time_budget' (segundos) o 'deadline' se aplica
+    al conjunto de arranques; los que ya no caben no se lanzan y el que esté en
+    curso devuelve su mejor solución al vencer el plazo.
+    Caché memo: con 'memo_mb' (MB) se crea una MakespanCache LRU compartida por
+    todos los arranques de esta llamada. Sus contadores (aciertos/fallos) se
+    vuelcan en el dict 'stats' si se pasa. Con workers > 1 cada proceso crea
+    su propia caché al arrancar (la caché no viaja con cada tarea) y los
+    contadores no vuelven al padre.
+    Parada en la cota: con 'lower_bound', cada arranque para al alcanzarla y,
+    en cuanto uno la alcanza, no se lanzan (o se abandonan) los siguientes.
+    Las medias se calculan entonces sobre los arranques ejecutados.
+    Perfilado: con 'profile' (src/profiling.SolverProfile) se acumulan los
+    contadores y tiempos de todos los arranques; con workers > 1 cada proceso
+    rellena su propio perfil y el padre los suma. Si hay caché memo y los
+    arranques van en serie, sus aciertos y fallos se añaden también al perfil.
+    """
+    deadline = _resolve_deadline(kwargs)
+    if deadline is not None:
+        kwargs = dict(kwargs, deadline=deadline)
+    lower_bound = kwargs.get('lower_bound')
+    profile = kwargs.get('profile')
+    workers = kwargs.get('workers', 1) or 1
+    parallel = workers > 1 and n_restarts > 1
+    memo_cache = None
+    if kwargs.get('memo_mb') and not parallel:
+        memo_cache = MakespanCache(get_evaluator(instance), max_mb=kwargs['memo_mb'])
+        kwargs = dict(kwargs, memo_cache=memo_cache)
+    base_seed = kwargs.get('seed')
+    if workers > 1 and base_seed is None:
+        base_seed = random.randrange(2**31)
+    seeds = [None if base_seed is None else base_seed + i for i in range(n_restarts)]
+
+    if parallel:
+        # El 'with' termina el Pool al salir (también si salta una excepción),
+        # sin esperar a los hijos. Si el supervisor de main.py corta el trabajo
+        # por tiempo, termina todo su grupo de procesos, hijos del Pool incluidos.
+        # El perfil no viaja a los hijos: cada uno devuelve el suyo y aquí se suman
+        run = _run_restart if profile is None else _run_restart_profiled
+        child_kwargs = kwargs if profile is None else {k: v for k, v in kwargs.items() if k != 'profile'}
+        with multiprocessing.Pool(processes=min(workers, n_restarts), initializer=_init_restart_worker,
+                                  initargs=(instance, kwargs.get('memo_mb'))) as pool:
+            pending = [
+                pool.apply_async(run, (instance, algorithm_func, seed, child_kwargs, i == 0))
+                for i, seed in enumerate(seeds)
+            ]
+            restarts = []
+            for p in pending:
+                restart = p.get()
+                if profile is not None:
+                    restart, child_profile = restart
+                    profile.merge(child_profile)
+                restarts.append(restart)
+                if _reached_bound(restarts[-1], lower_bound):
+                    break
+    else:
+        restarts = []
+        for i, seed in enumerate(seeds):
+            restarts.append(_run_restart(instance, algorithm_func, seed, kwargs, i == 0))
+            if _reached_bound(restarts[-1], lower_bound):
+                break
+    restarts = [r for r in restarts if r is not None]
+
+    results_makespan = [val for _, val, _ in restarts]
+    results_time = [elapsed for _, _, elapsed in restarts]
+    
+    best_global_makespan = float('inf')
+    best_global_seq = []
+    for sol, val, _ in restarts:
         if val < best_global_makespan:
             best_global_makespan = val
             best_global_seq = sol[:]
@@ -333,4 +722,11 @@ def multi_start_solver(instance, algorithm_func, n_restarts=5, **kwargs):
     avg_makespan = sum(results_makespan) / len(results_makespan)
     avg_time = sum(results_time) / len(results_time)
 
-    return best_global_seq, avg_makespan, avg_time
\ No newline at end of file
+    if memo_cache is not None and kwargs.get('stats') is not None:
+        kwargs['stats'].update(memo_cache.counters())
+    if memo_cache is not None and profile is not None:
+        _record_profile(profile, memo_hits=memo_cache.hits, memo_misses=memo_cache.misses)
+
+    if kwargs.get('return_restart_times', False):
+        return best_global_seq, avg_makespan, avg_time, results_time
+    return best_global_seq, avg_makespan, avg_time
@@ -0,0 +1,301 @@
+"""
+Cotas inferiores del makespan para GCSP.
+
+La cota clásica (calculate_lower_bound en src/algorithms.py) es
+max(carga media, tarea más larga) e ignora los desplazamientos. Aquí se
+añaden cotas que sí los tienen en cuenta, válidas para el simulador de
+src/evaluator.py, donde el fin de cada tarea incluye el viaje de la grúa
+(fin = inicio + p_0 + distancia * t_0) y las grúas nunca se cruzan:
+
+- Trabajo + viaje: cada tarea i necesita p_i más el viaje desde la grúa más
+  cercana a su posición inicial.
+- Zonas: las rutas de las grúas, cada una un intervalo que contiene su
+  posición inicial, deben cubrir todas las tareas. Eso fija un viaje total
+  mínimo (extremos de la bahía y huecos entre grúas vecinas) que se suma a la
+  carga media. Además, la tarea del extremo izquierdo la atiende siempre la
+  grúa 1 si está a su izquierda (la derecha, la grúa m).
+- Flujo: relajación de transporte resuelta con max-flow. Las tareas envían
+  p_i a las grúas que pueden alcanzarlas antes de C, cada grúa admite como
+  mucho C menos su viaje forzado, y todas juntas m * C menos el viaje mínimo
+  total. Se busca el menor C con flujo completo.
+- Partición: reparto entero de las tareas entre grúas (como P||Cmax), donde
+  cada grúa paga su carga más el viaje mínimo para recorrer desde su posición
+  inicial el intervalo de sus tareas. Se decide con búsqueda en profundidad
+  acotada por nodos; en instancias pequeñas suele coincidir con el óptimo.
+
+compute_lower_bound devuelve el máximo de todas, redondeado hacia arriba
+cuando los makespans son enteros.
+"""
+import math
+from collections import deque
+from typing import Dict, List
+
+from src.algorithms import calculate_lower_bound
+
+EPS = 1e-9
+
+
+def _integral_makespans(instance) -> bool:
+    """Con p_0 y t_0 enteros todos los makespans del simulador son enteros."""
+    return float(instance.t_0).is_integer() and all(float(t.p_0).is_integer() for t in instance.tasks)
+
+
+def _round_up(value: float, integral: bool) -> float:
+    return math.ceil(value - EPS) if integral else value
+
+
+def job_bound(instance) -> float:
+    """max_i (p_i + t_0 * distancia de la tarea i a la grúa más cercana al inicio)."""
+    crane_locs = [c.location for c in instance.cranes]
+    return max(t.p_0 + instance.t_0 * min(abs(t.location - c) for c in crane_locs)
+               for t in instance.tasks)
+
+
+def forced_travel(instance) -> List[float]:
+    """Distancia que cada grúa tiene que recorrer sí o sí (por orden de posición).
+
+    Como las grúas no se cruzan, la tarea más a la izquierda solo puede
+    atenderla la grúa 1 si la tarea está a su izquierda; la más a la derecha,
+    la grúa m si está a su derecha.
+    """
+    crane_locs = sorted(c.location for c in instance.cranes)
+    task_locs = [t.location for t in instance.tasks]
+    forced = [0.0] * len(crane_locs)
+    forced[0] += max(0, crane_locs[0] - min(task_locs))
+    forced[-1] += max(0, max(task_locs) - crane_locs[-1])
+    return forced
+
+
+def min_total_travel(instance) -> float:
+    """Viaje mínimo sumado de todas las grúas para cubrir todas las tareas.
+
+    La ruta de cada grúa recorre al menos el intervalo [mín, máx] de sus
+    posiciones, que contiene su posición inicial. Entre dos grúas vecinas la
+    unión de sus intervalos solo puede dejar sin cubrir un hueco libre de
+    tareas, así que cuesta al menos (distancia entre grúas - mayor hueco).
+    """
+    crane_locs = sorted(c.location for c in instance.cranes)
+    task_locs = sorted(t.location for t in instance.tasks)
+    total = sum(forced_travel(instance))
+    for left, right in zip(crane_locs, crane_locs[1:]):
+        points = [left] + [x for x in task_locs if left < x < right] + [right]
+        if len(points) > 2:
+            total += (right - left) - max(b - a for a, b in zip(points, points[1:]))
+    return total
+
+
+def zone_bound(instance) -> float:
+    """Carga media con el viaje mínimo total: (sum p_i + t_0 * viaje mínimo) / m."""
+    total_p = sum(t.p_0 for t in instance.tasks)
+    return (total_p + instance.t_0 * min_total_travel(instance)) / len(instance.cranes)
+
+
+# =========================================================
+# PARTICIÓN ENTERA (ZONAS POR GRÚA)
+# =========================================================
+def _route_travel(lo: int, hi: int, start: int) -> int:
+    """Viaje mínimo de una grúa que sale de 'start' y visita todo [lo, hi] (sin volver)."""
+    return (hi - lo) + min(start - lo, hi - start)
+
+
+def partition_feasible(instance, makespan: float, node_limit: int = 50000):
+    """¿Existe un reparto de tareas entre grúas con carga + viaje <= C en todas?
+
+    Relajación que ignora el orden y los bloqueos: cada grúa k recibe un
+    conjunto de tareas y necesita sum p_i + t_0 * viaje mínimo para recorrer el
+    intervalo que las contiene desde su posición inicial. Las tareas de los
+    extremos se fijan a las grúas 1 y m cuando quedan fuera de ellas (ver
+    forced_travel). Búsqueda en profundidad con las tareas de mayor a menor p_i.
+
+    Returns:
+        True o False, o None si se agota 'node_limit' sin decidir.
+    """
+    crane_locs = sorted(c.location for c in instance.cranes)
+    m, t_0 = len(crane_locs), instance.t_0
+    tasks = sorted(instance.tasks, key=lambda t: -t.p_0)
+    task_locs = [t.location for t in tasks]
+    left, right = min(task_locs), max(task_locs)
+    allowed = []
+    for task in tasks:
+        if task.location == left and left <= crane_locs[0]:
+            allowed.append([0])
+        elif task.location == right and right > crane_locs[-1]:
+            allowed.append([m - 1])
+        else:
+            allowed.append(list(range(m)))
+
+    suffix_p = [0] * (len(tasks) + 1)
+    for i in range(len(tasks) - 1, -1, -1):
+        suffix_p[i] = suffix_p[i + 1] + tasks[i].p_0
+
+    loads = [0.0] * m
+    lo, hi = crane_locs[:], crane_locs[:]
+    nodes = 0
+
+    def used():
+        return sum(loads[k] + t_0 * _route_travel(lo[k], hi[k], crane_locs[k]) for k in range(m))
+
+    def search(i):
+        nonlocal nodes
+        if i == len(tasks):
+            return True
+        nodes += 1
+        if nodes > node_limit:
+            return None
+        if used() + suffix_p[i] > m * makespan + EPS:
+            return False
+        task = tasks[i]
+        x = task.location
+        undecided = False
+        for k in allowed[i]:
+            new_lo, new_hi = min(lo[k], x), max(hi[k], x)
+            cost = loads[k] + task.p_0 + t_0 * _route_travel(new_lo, new_hi, crane_locs[k])
+            if cost > makespan + EPS:
+                continue
+            old = loads[k], lo[k], hi[k]
+            loads[k], lo[k], hi[k] = loads[k] + task.p_0, new_lo, new_hi
+            found = search(i + 1)
+            loads[k], lo[k], hi[k] = old
+            if found:
+                return True
+            if found is None:
+                undecided = True
+                if nodes > node_limit:
+                    return None
+        return None if undecided else False
+
+    return search(0)
+
+
+def partition_bound(instance, low: float = 0.0, node_limit: int = 50000) -> float:
+    """Menor C que la relajación de partición no puede descartar (búsqueda binaria desde 'low').
+
+    Solo cuenta como imposible un C demostrado como tal; si la búsqueda de
+    partition_feasible se corta, C se trata como posible y la cota sigue
+    siendo válida (solo menos ajustada). Exige makespans enteros; si no, devuelve 'low'.
+    """
+    if not _integral_makespans(instance):
+        return low
+    low = _round_up(low, True)
+    if partition_feasible(instance, low, node_limit) is not False:
+        return low
+    high = low + 1
+    while partition_feasible(instance, high, node_limit) is False:
+        low, high = high, high + 2 * (high - low)
+    # Invariante: 'low' imposible, 'high' no descartado
+    while high - low > 1:
+        mid = (low + high) // 2
+        if partition_feasible(instance, mid, node_limit) is False:
+            low = mid
+        else:
+            high = mid
+    return high
+
+
+# =========================================================
+# RELAJACIÓN DE FLUJO
+# =========================================================
+def _max_flow(capacity: List[Dict[int, float]], source: int, sink: int) -> float:
+    """Edmonds-Karp sobre una lista de adyacencia {destino: capacidad residual} (se modifica)."""
+    flow = 0.0
+    while True:
+        parent = {source: None}
+        frontier = deque([source])
+        while frontier and sink not in parent:
+            u = frontier.popleft()
+            for v, cap in capacity[u].items():
+                if cap > EPS and v not in parent:
+                    parent[v] = u
+                    frontier.append(v)
+        if sink not in parent:
+            return flow
+        path_cap = float('inf')
+        v = sink
+        while parent[v] is not None:
+            path_cap = min(path_cap, capacity[parent[v]][v])
+            v = parent[v]
+        v = sink
+        while parent[v] is not None:
+            u = parent[v]
+            capacity[u][v] -= path_cap
+            capacity[v][u] = capacity[v].get(u, 0.0) + path_cap
+            v = u
+        flow += path_cap
+
+
+def flow_feasible(instance, makespan: float) -> bool:
+    """¿Admite la relajación de transporte un makespan 'makespan'?
+
+    Red: origen -> tarea i (p_i) -> grúa k (si p_i + t_0 * d_ik <= C) ->
+    nodo común (C - t_0 * viaje forzado de k) -> destino (m * C - t_0 * viaje
+    mínimo total). Un plan real con makespan C da un flujo que satura todas
+    las tareas, así que si el flujo máximo no llega a sum p_i, C es imposible.
+    """
+    tasks = instance.tasks
+    crane_locs = sorted(c.location for c in instance.cranes)
+    n, m, t_0 = len(tasks), len(crane_locs), instance.t_0
+    forced = forced_travel(instance)
+    hub_cap = m * makespan - t_0 * min_total_travel(instance)
+    if hub_cap < -EPS or any(makespan - t_0 * f < -EPS for f in forced):
+        return False
+
+    source, hub, sink = n + m, n + m + 1, n + m + 2
+    capacity = [dict() for _ in range(n + m + 3)]
+    for i, task in enumerate(tasks):
+        capacity[source][i] = float(task.p_0)
+        for k, loc in enumerate(crane_locs):
+            if task.p_0 + t_0 * abs(task.location - loc) <= makespan + EPS:
+                capacity[i][n + k] = float(task.p_0)
+    for k in range(m):
+        capacity[n + k][hub] = makespan - t_0 * forced[k]
+    capacity[hub][sink] = hub_cap
+
+    total_p = sum(t.p_0 for t in tasks)
+    return _max_flow(capacity, source, sink) >= total_p - 1e-6
+
+
+def flow_bound(instance, low: float = 0.0, tolerance: float = 1e-3) -> float:
+    """Menor makespan que admite la relajación de flujo (búsqueda binaria desde 'low').
+
+    Con makespans enteros se busca entre enteros y el resultado es exacto
+    para la relajación. Si no, se devuelve el mayor valor descartado, que
+    también es una cota válida.
+    """
+    integral = _integral_makespans(instance)
+    low = _round_up(low, integral)
+    if flow_feasible(instance, low):
+        return low
+    # Con makespans enteros la búsqueda se queda en enteros (mismo tipo que las demás cotas)
+    high = max(low, 1) * 2 if integral else max(low, 1.0) * 2
+    while not flow_feasible(instance, high):
+        low, high = high, high * 2
+    # Invariante: 'low' imposible, 'high' posible
+    while high - low > (1 if integral else tolerance):
+        mid = (low + high) // 2 if integral else (low + high) / 2
+        if flow_feasible(instance, mid):
+            high = mid
+        else:
+            low = mid
+    return high if integral else low
+
+
+def lower_bounds(instance, node_limit: int = 50000) -> Dict[str, float]:
+    """Todas las cotas de la instancia por nombre ('classic', 'job', 'zone', 'flow', 'partition').
+
+    Cada cota parte del máximo de las anteriores, así que 'partition' es
+    siempre la mayor; las demás se devuelven para comparar su aportación.
+    """
+    integral = _integral_makespans(instance)
+    bounds = {
+        'classic': calculate_lower_bound(instance),
+        'job': _round_up(job_bound(instance), integral),
+        'zone': _round_up(zone_bound(instance), integral),
+    }
+    bounds['flow'] = flow_bound(instance, low=max(bounds.values()))
+    bounds['partition'] = partition_bound(instance, low=bounds['flow'], node_limit=node_limit)
+    return bounds
+
+
+def compute_lower_bound(instance, node_limit: int = 50000) -> float:
+    """Mejor cota inferior disponible: el máximo de lower_bounds(instance)."""
+    return max(lower_bounds(instance, node_limit).values())
@@ -0,0 +1,498 @@
+# src/evaluator.py
+"""
+Evaluador compilado del makespan para GCSP.
+
+`calculate_makespan` reconstruía en cada llamada el mapa de tareas por id,
+la lista de posiciones de las grúas y la de tiempos disponibles. Aquí esa
+preparación se hace UNA sola vez por instancia: se guardan arrays planos
+indexados por id de tarea y buffers de trabajo preasignados que se
+reinicializan (sin reservar memoria) en cada evaluación.
+
+Para la búsqueda local se ofrece además un modo incremental: se guarda el
+estado del simulador antes de cada posición de la solución actual y los
+vecinos (swap/insert/invert) se evalúan reanudando desde la primera posición
+modificada, ya que el prefijo anterior es común.
+
+El máximo de los tiempos de finalización en el trayecto de cada grúa se
+obtiene con max() sobre el tramo o, en bahías muy grandes, con un árbol de
+segmentos de máximos (consulta O(log n) y actualización puntual). Como las
+grúas no se cruzan, el par de grúas que rodea cada tarea se localiza con
+una búsqueda binaria sobre sus posiciones (siempre ordenadas).
+
+`evaluate_batch` simula K secuencias a la vez con operaciones vectorizadas
+de NumPy (dependencia opcional: solo se importa si existe).
+
+Por último, `MakespanCache` es una caché memo opcional (LRU con tope de
+memoria) delante del evaluador, para no re-simular secuencias ya vistas.
+"""
+import sys
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: solo lo necesita evaluate_batch
+    np = None
+
+
+# Tamaño de bahía (n + 2 localizaciones) a partir del cual 'auto' usa el árbol
+# de segmentos. Por debajo, max() sobre el tramo (en C) es más rápido.
+SEGMENT_TREE_MIN_BAY = 256
+
+
+class MakespanEvaluator:
+    """Simulador del makespan precompilado para una instancia concreta.
+
+    Attributes:
+        n: Número de tareas.
+        m: Número de grúas.
+        t_0: Velocidad de desplazamiento (tiempo por unidad de distancia).
+        loc_by_id: Localización de cada tarea, indexada por id.
+        p0_by_id: Tiempo base de proceso de cada tarea, indexado por id.
+    """
+
+    def __init__(self, instance, range_max: str = 'auto', crane_lookup: str = 'auto'):
+        """
+        Args:
+            instance: Instancia GCSP.
+            range_max: Cómo se obtiene el máximo de `tasks_completion_by_loc` en el
+                trayecto de la grúa: 'scan' (max() sobre el tramo, O(distancia)),
+                'tree' (árbol de segmentos, O(log n)) o 'auto' (árbol solo si la
+                bahía supera SEGMENT_TREE_MIN_BAY localizaciones).
+            crane_lookup: Cómo se busca el par de grúas que rodea cada tarea:
+                'bisect' (búsqueda binaria, O(log m)), 'linear' (recorrido, O(m))
+                o 'auto' (bisect si las grúas empiezan ordenadas por posición).
+        """
+        arrays = instance.arrays
+        self.n = len(arrays.ids)
+        self.m = len(arrays.crane_ids)
+        self.t_0 = instance.t_0
+
+        # Arrays planos indexados por id, copiados de la vista de la instancia
+        # a listas (el acceso por índice a una lista es el más rápido en CPython)
+        self.loc_by_id = arrays.loc_by_id.tolist()
+        self.p0_by_id = arrays.p0_by_id.tolist()
+
+        # Estado inicial (con grúas centinela en 0 y n+1)
+        self._init_pos = [0] + arrays.crane_locations.tolist() + [self.n + 1]
+        self._init_avail = [float('inf')] + [0.0] * self.m + [float('inf')]
+        # Las grúas no se cruzan: si empiezan ordenadas, sus posiciones siguen
+        # ordenadas durante toda la simulación y se puede usar bisect.
+        if crane_lookup == 'auto':
+            crane_lookup = 'bisect' if self._init_pos == sorted(self._init_pos) else 'linear'
+        self.crane_lookup = crane_lookup
+
+        if range_max == 'auto':
+            range_max = 'tree' if self.n + 2 > SEGMENT_TREE_MIN_BAY else 'scan'
+        self.range_max = range_max
+        if range_max == 'tree':
+            # Árbol de segmentos de máximos: hojas en [leaf, leaf + n + 2), raíz en 1
+            self._leaf = 1
+            while self._leaf < self.n + 2:
+                self._leaf *= 2
+            self._init_comp = [0.0] * (2 * self._leaf)
+        else:
+            self._leaf = 0
+            self._init_comp = [0.0] * (self.n + 2)
+
+        # Buffers de trabajo reutilizados entre llamadas
+        self._pos = self._init_pos[:]
+        self._avail = self._init_avail[:]
+        self._comp = self._init_comp[:]
+
+        # Arrays NumPy para evaluate_batch (se crean al primer uso)
+        self._np_loc = None
+
+    def evaluate(self, task_sequence_ids: Sequence[int]) -> float:
+        """Calcula el makespan de una secuencia (equivalente a `calculate_makespan`).
+
+        Args:
+            task_sequence_ids: Orden de despacho de las tareas (ids).
+
+        Returns:
+            Makespan de la secuencia.
+        """
+        self._pos[:] = self._init_pos
+        self._avail[:] = self._init_avail
+        self._comp[:] = self._init_comp
+        return self._simulate(task_sequence_ids, 0, None)
+
+    def checkpoint(self, task_sequence_ids: Sequence[int]) -> 'Checkpoints':
+        """Evalúa una secuencia guardando el estado del simulador antes de cada posición.
+
+        Las instantáneas permiten evaluar después cualquier vecino que comparta
+        el prefijo con esta secuencia sin repetir la simulación de dicho prefijo.
+
+        Args:
+            task_sequence_ids: Secuencia base (la solución actual de la búsqueda).
+
+        Returns:
+            Instantáneas de la secuencia base, con su makespan.
+        """
+        self._pos[:] = self._init_pos
+        self._avail[:] = self._init_avail
+        self._comp[:] = self._init_comp
+        checkpoints = Checkpoints()
+        checkpoints.makespan = self._simulate(task_sequence_ids, 0, checkpoints)
+        return checkpoints
+
+    def evaluate_from(self, checkpoints: 'Checkpoints', task_sequence_ids: Sequence[int],
+                      first_changed: int, cutoff: float = float('inf')) -> float:
+        """Evalúa un vecino reanudando la simulación desde la instantánea de la base.
+
+        Args:
+            checkpoints: Instantáneas de la secuencia base (ver `checkpoint`).
+            task_sequence_ids: Vecino a evaluar.
+            first_changed: Primera posición en la que el vecino difiere de la base.
+                Las posiciones anteriores deben coincidir con la secuencia base.
+            cutoff: Cota de poda. El makespan solo puede crecer a lo largo de la
+                secuencia, así que en cuanto un tiempo de fin alcanza `cutoff` se
+                abandona la simulación.
+
+        Returns:
+            Makespan del vecino (idéntico al de `evaluate`) si es menor que `cutoff`;
+            si no, un valor parcial >= `cutoff`.
+        """
+        self._pos[:] = checkpoints.pos[first_changed]
+        self._avail[:] = checkpoints.avail[first_changed]
+        self._comp[:] = checkpoints.comp[first_changed]
+        if cutoff != float('inf'):
+            prefix_max = self._comp[1] if self._leaf else max(self._comp)
+            if prefix_max >= cutoff:
+                return prefix_max
+        return self._simulate(task_sequence_ids, first_changed, None, cutoff)
+
+    def decode(self, task_sequence_ids: Sequence[int]) -> List[Tuple[int, int, float, float]]:
+        """Reconstruye el plan que el simulador asigna a una secuencia.
+
+        Se obtiene de las instantáneas de `checkpoint`: en cada paso solo cambia
+        el tiempo disponible de la grúa que despacha la tarea.
+
+        Args:
+            task_sequence_ids: Orden de despacho de las tareas (ids).
+
+        Returns:
+            Una tupla (id de tarea, grúa 1..m, inicio del proceso, fin) por tarea,
+            en el orden de la secuencia. El inicio del proceso es el fin menos
+            p_0: el viaje previo de la grúa queda antes de él.
+        """
+        checkpoints = self.checkpoint(task_sequence_ids)
+        schedule = []
+        for idx, task_id in enumerate(task_sequence_ids):
+            before, after = checkpoints.avail[idx], checkpoints.avail[idx + 1]
+            k = next(g for g in range(1, self.m + 1) if after[g] != before[g])
+            schedule.append((task_id, k, after[k] - self.p0_by_id[task_id], after[k]))
+        return schedule
+
+    def evaluate_batch(self, sequences) -> 'np.ndarray':
+        """Calcula el makespan de K secuencias a la vez con NumPy.
+
+        Cada paso del simulador se aplica a las K secuencias en paralelo. La
+        grúa se localiza por conteo sobre las posiciones (las grúas no se
+        cruzan, así que siempre están ordenadas) y el bloqueo del trayecto
+        se obtiene con una máscara sobre `tasks_completion_by_loc`.
+
+        Args:
+            sequences: Matriz K x n (o lista de listas) de ids de tareas.
+
+        Returns:
+            Vector de K makespans, idénticos a los de `evaluate`.
+
+        Raises:
+            ImportError: Si NumPy no está instalado.
+        """
+        if np is None:
+            raise ImportError("evaluate_batch requiere NumPy (pip install numpy)")
+        if self._np_loc is None:
+            self._np_loc = np.asarray(self.loc_by_id, dtype=np.int64)
+            self._np_p0 = np.asarray(self.p0_by_id, dtype=np.float64)
+            self._np_cols = np.arange(self.n + 2)
+
+        seqs = np.asarray(sequences, dtype=np.int64)
+        if seqs.ndim != 2:
+            raise ValueError("evaluate_batch espera una matriz K x n de secuencias")
+        K, length = seqs.shape
+        m = self.m
+        rows = np.arange(K)
+        cols = self._np_cols
+        locs = self._np_loc[seqs]
+        p0s = self._np_p0[seqs]
+
+        cranes_pos = np.tile(np.asarray(self._init_pos, dtype=np.int64), (K, 1))
+        cranes_avail_time = np.tile(np.asarray(self._init_avail, dtype=np.float64), (K, 1))
+        tasks_completion_by_loc = np.zeros((K, self.n + 2), dtype=np.float64)
+
+        for idx in range(length):
+            target_loc = locs[:, idx]
+
+            # Par de grúas que rodea target_loc (primer j con pos[j] <= loc <= pos[j+1])
+            j = (cranes_pos < target_loc[:, None]).sum(axis=1) - 1
+            j1 = j + 1
+            avail_j = cranes_avail_time[rows, j]
+            avail_j1 = cranes_avail_time[rows, j1]
+            dist_j = np.abs(cranes_pos[rows, j] - target_loc)
+            dist_j1 = np.abs(cranes_pos[rows, j1] - target_loc)
+            k = np.where(avail_j < avail_j1, j,
+                         np.where(avail_j > avail_j1, j1,
+                                  np.where(dist_j <= dist_j1, j, j1)))
+            # Corrección de seguridad (centinelas)
+            k = np.clip(k, 1, m)
+
+            current_loc = cranes_pos[rows, k]
+            min_path = np.minimum(current_loc, target_loc)
+            max_path = np.maximum(current_loc, target_loc)
+
+            # Bloqueo por interferencias en el trayecto (los tiempos son >= 0)
+            on_path = (cols >= min_path[:, None]) & (cols <= max_path[:, None])
+            max_block_time = np.where(on_path, tasks_completion_by_loc, 0.0).max(axis=1)
+
+            travel_time = (max_path - min_path) * self.t_0
+            start_time = np.maximum(max_block_time, cranes_avail_time[rows, k])
+            finish_time = start_time + p0s[:, idx] + travel_time
+
+            cranes_pos[rows, k] = target_loc
+            cranes_avail_time[rows, k] = finish_time
+            tasks_completion_by_loc[rows, target_loc] = finish_time
+
+        return tasks_completion_by_loc.max(axis=1)
+
+    def _simulate(self, task_sequence_ids, begin, checkpoints, cutoff=float('inf')):
+        """Simula la secuencia desde la posición `begin` sobre los buffers de trabajo.
+
+        Si algún tiempo de fin alcanza `cutoff` se para y se devuelve ese tiempo.
+        """
+        m = self.m
+        t_0 = self.t_0
+        loc_by_id = self.loc_by_id
+        p0_by_id = self.p0_by_id
+
+        cranes_pos = self._pos
+        cranes_avail_time = self._avail
+        tasks_completion_by_loc = self._comp
+        last_gap = m + 1
+        leaf = self._leaf
+        use_bisect = self.crane_lookup == 'bisect'
+
+        for idx in range(begin, len(task_sequence_ids)):
+            if checkpoints is not None:
+                checkpoints.pos.append(cranes_pos[:])
+                checkpoints.avail.append(cranes_avail_time[:])
+                checkpoints.comp.append(tasks_completion_by_loc[:])
+
+            task_id = task_sequence_ids[idx]
+            target_loc = loc_by_id[task_id]
+
+            # Par de grúas (j, j+1) que rodea target_loc: el primer j con
+            # pos[j] <= target_loc <= pos[j+1]
+            if use_bisect:
+                j = bisect_left(cranes_pos, target_loc) - 1
+            else:
+                j = -1
+                for g in range(last_gap):
+                    if cranes_pos[g] <= target_loc <= cranes_pos[g + 1]:
+                        j = g
+                        break
+
+            # Selección de grúa (Lógica Greedy por tiempo disponible)
+            selected_crane_idx = -1
+            if j >= 0:
+                if cranes_avail_time[j] < cranes_avail_time[j + 1]:
+                    selected_crane_idx = j
+                elif cranes_avail_time[j] > cranes_avail_time[j + 1]:
+                    selected_crane_idx = j + 1
+                else:
+                    # Desempate por distancia
+                    dist_j = abs(cranes_pos[j] - target_loc)
+                    dist_j1 = abs(cranes_pos[j + 1] - target_loc)
+                    selected_crane_idx = j if dist_j <= dist_j1 else j + 1
+
+            # Corrección de seguridad
+            if selected_crane_idx == 0: selected_crane_idx = 1
+            if selected_crane_idx == m + 1: selected_crane_idx = m
+
+            k = selected_crane_idx
+            current_loc = cranes_pos[k]
+
+            if current_loc < target_loc:
+                min_path, max_path = current_loc, target_loc
+            else:
+                min_path, max_path = target_loc, current_loc
+
+            # Bloqueo por interferencias en el trayecto
+            if leaf:
+                # Consulta de máximo en el árbol sobre [min_path, max_path]
+                max_block_time = 0.0
+                lo = leaf + min_path
+                hi = leaf + max_path + 1
+                while lo < hi:
+                    if lo & 1:
+                        v = tasks_completion_by_loc[lo]
+                        if v > max_block_time: max_block_time = v
+                        lo += 1
+                    if hi & 1:
+                        hi -= 1
+                        v = tasks_completion_by_loc[hi]
+                        if v > max_block_time: max_block_time = v
+                    lo >>= 1
+                    hi >>= 1
+            else:
+                max_block_time = max(tasks_completion_by_loc[min_path:max_path + 1])
+            travel_time = (max_path - min_path) * t_0
+
+            avail = cranes_avail_time[k]
+            start_time = max_block_time if max_block_time > avail else avail
+            finish_time = start_time + p0_by_id[task_id] + travel_time
+            if finish_time >= cutoff:
+                return finish_time
+
+            # Actualizar estado
+            cranes_pos[k] = target_loc
+            cranes_avail_time[k] = finish_time
+            if leaf:
+                # El tramo incluye target_loc, así que finish_time nunca es menor
+                # que el valor que sustituye: basta subir mientras el padre sea menor.
+                node = leaf + target_loc
+                tasks_completion_by_loc[node] = finish_time
+                node >>= 1
+                while node and tasks_completion_by_loc[node] < finish_time:
+                    tasks_completion_by_loc[node] = finish_time
+                    node >>= 1
+            else:
+                tasks_completion_by_loc[target_loc] = finish_time
+
+        if checkpoints is not None:
+            # Estado final: permite "reanudar" vecinos idénticos a la base
+            checkpoints.pos.append(cranes_pos[:])
+            checkpoints.avail.append(cranes_avail_time[:])
+            checkpoints.comp.append(tasks_completion_by_loc[:])
+
+        if leaf:
+            return tasks_completion_by_loc[1]
+        return max(tasks_completion_by_loc)
+
+
+class Checkpoints:
+    """Estado del simulador antes de cada posición de una secuencia base.
+
+    Attributes:
+        pos: `pos[i]` son las posiciones de las grúas antes de despachar la posición i
+            (hay n+1 entradas: la última es el estado final).
+        avail: `avail[i]` son los tiempos disponibles de las grúas en ese instante.
+        comp: `comp[i]` son los tiempos de finalización por localización (o el
+            árbol de segmentos completo si el evaluador usa range_max='tree').
+        makespan: Makespan de la secuencia base completa.
+    """
+    __slots__ = ('pos', 'avail', 'comp', 'makespan')
+
+    def __init__(self):
+        self.pos = []
+        self.avail = []
+        self.comp = []
+        self.makespan = None
+
+
+class MakespanCache:
+    """Caché memo de makespans con tope de memoria y expulsión LRU.
+
+    Se antepone a un `MakespanEvaluator` y ofrece su misma interfaz, de modo
+    que la búsqueda puede usar uno u otro indistintamente. La clave es la
+    secuencia empaquetada en bytes (exacta, sin colisiones). Las evaluaciones
+    podadas por `cutoff` no se guardan, porque su valor es solo parcial.
+
+    Attributes:
+        evaluator: Evaluador al que se delega en caso de fallo.
+        max_bytes: Memoria máxima estimada para las entradas.
+        hits: Nº de consultas resueltas por la caché.
+        misses: Nº de consultas que hubo que simular.
+    """
+
+    # Sobrecoste estimado por entrada (nodo del OrderedDict + float), además de la clave
+    ENTRY_OVERHEAD = 160
+
+    def __init__(self, evaluator: MakespanEvaluator, max_mb: float = 64):
+        self.evaluator = evaluator
+        self.max_bytes = int(max_mb * 2**20)
+        self._typecode = 'B' if len(evaluator.loc_by_id) <= 256 else 'I'
+        self._entries = OrderedDict()
+        self._max_entries = None
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, task_sequence_ids):
+        if self._typecode == 'B':
+            return bytes(task_sequence_ids)
+        return array(self._typecode, task_sequence_ids).tobytes()
+
+    def _lookup(self, key):
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key, value):
+        if self._max_entries is None:
+            self._max_entries = max(1, self.max_bytes // (sys.getsizeof(key) + self.ENTRY_OVERHEAD))
+        self._entries[key] = value
+        if len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def evaluate(self, task_sequence_ids: Sequence[int]) -> float:
+        """Como `MakespanEvaluator.evaluate`, consultando antes la caché."""
+        key = self._key(task_sequence_ids)
+        value = self._lookup(key)
+        if value is None:
+            value = self.evaluator.evaluate(task_sequence_ids)
+            self._store(key, value)
+        return value
+
+    def evaluate_from(self, checkpoints: 'Checkpoints', task_sequence_ids: Sequence[int],
+                      first_changed: int, cutoff: float = float('inf')) -> float:
+        """Como `MakespanEvaluator.evaluate_from`, consultando antes la caché."""
+        key = self._key(task_sequence_ids)
+        value = self._lookup(key)
+        if value is None:
+            value = self.evaluator.evaluate_from(checkpoints, task_sequence_ids, first_changed, cutoff)
+            if value < cutoff:
+                self._store(key, value)
+        return value
+
+    def checkpoint(self, task_sequence_ids: Sequence[int]) -> 'Checkpoints':
+        """Delegado en el evaluador; el makespan de la base se guarda en la caché."""
+        checkpoints = self.evaluator.checkpoint(task_sequence_ids)
+        self._store(self._key(task_sequence_ids), checkpoints.makespan)
+        return checkpoints
+
+    def evaluate_batch(self, sequences):
+        """Delegado en el evaluador (la simulación vectorizada no usa la caché)."""
+        return self.evaluator.evaluate_batch(sequences)
+
+    def counters(self) -> dict:
+        """Contadores de uso: aciertos, fallos, tasa de acierto y entradas actuales."""
+        total = self.hits + self.misses
+        return {
+            'memo_hits': self.hits,
+            'memo_misses': self.misses,
+            'memo_hit_rate': self.hits / total if total else 0.0,
+            'memo_entries': len(self._entries),
+        }
+
+
+def get_evaluator(instance) -> MakespanEvaluator:
+    """Devuelve el evaluador compilado de la instancia (se crea una sola vez).
+
+    Args:
+        instance: Instancia GCSP.
+
+    Returns:
+        Evaluador asociado a la instancia.
+    """
+    evaluator = instance._evaluator
+    if evaluator is None:
+        evaluator = MakespanEvaluator(instance)
+        instance._evaluator = evaluator
+    return evaluator
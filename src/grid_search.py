@@ -0,0 +1,267 @@
+"""
+Motor de búsqueda de hiperparámetros (grid search) para GRASP + VNS/Tabu.
+
+Cada celda de trabajo es (configuración, instancia, semilla): un arranque
+completo (_run_restart) reproducible. Los trabajos se reparten en un Pool de
+procesos y cada resultado se guarda en un archivo JSON Lines (src/results.py)
+que actúa de caché en disco: al repetir la búsqueda, las celdas ya resueltas
+no se vuelven a ejecutar.
+
+Con successive halving solo sobreviven a cada ronda las mejores 1/eta
+configuraciones, y la siguiente ronda multiplica por eta las instancias
+evaluadas. Así, las configuraciones malas se descartan tras pocas instancias.
+"""
+import itertools
+import math
+import multiprocessing
+import random
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.algorithms import _run_restart, variable_neighborhood_search
+from src.results import ResultSink, read_results, make_record, config_hash, STATUS_OK
+
+# Nombres cortos del espacio de parámetros -> argumentos del algoritmo
+PARAM_ALIASES = {
+    'tenure': 'tabu_tenure',
+    'candidates': 'candidates_per_iter',
+    'alpha': 'grasp_alpha',
+    'vns_loops': 'vns_loops',
+    'init_strategy': 'init_strategy',
+}
+
+
+def expand_grid(space: Dict[str, Sequence]) -> List[dict]:
+    """Producto cartesiano de un espacio {parámetro: [valores]} en orden estable."""
+    keys = sorted(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+def algorithm_kwargs(config: dict, instance) -> dict:
+    """Traduce una configuración a los kwargs del algoritmo.
+
+    Los nombres cortos de PARAM_ALIASES se renombran y el resto pasa tal cual.
+    Si no se fijan, 'max_iter' usa la fórmula del paper (6 * n * m) y
+    'pool_size' (SN de la inicialización aleatoria) vale 3 * n, como en main.py.
+    """
+    kwargs = {PARAM_ALIASES.get(k, k): v for k, v in config.items()}
+    if 'max_iter' not in kwargs:
+        kwargs['max_iter'] = 6 * len(instance.tasks) * len(instance.cranes)
+    if 'pool_size' not in kwargs:
+        kwargs['pool_size'] = 3 * len(instance.tasks)
+    return kwargs
+
+
+def instance_fingerprint(instance) -> str:
+    """Huella del contenido de una instancia (los generadores reutilizan nombres)."""
+    return config_hash({
+        'tasks': [(t.id, t.location, t.p_0) for t in instance.tasks],
+        'cranes': [(c.id, c.location) for c in instance.cranes],
+        's': instance.s,
+        't_0': instance.t_0,
+    })
+
+
+# =========================================================
+# TRABAJO EN LOS PROCESOS HIJO
+# =========================================================
+_WORKER_INSTANCES = None
+_WORKER_ALGORITHM = None
+
+
+def _init_worker(instances, algorithm_func):
+    """Inicializador del Pool: las instancias viajan una sola vez por proceso."""
+    global _WORKER_INSTANCES, _WORKER_ALGORITHM
+    _WORKER_INSTANCES = instances
+    _WORKER_ALGORITHM = algorithm_func
+
+
+def _run_job(job):
+    """Ejecuta una celda (clave, config, índice de instancia, semilla). Devuelve (clave, makespan, tiempo)."""
+    key, config, index, seed = job
+    instance = _WORKER_INSTANCES[index]
+    _, makespan, elapsed = _run_restart(instance, _WORKER_ALGORITHM, seed,
+                                        algorithm_kwargs(config, instance))
+    return key, makespan, elapsed
+
+
+# =========================================================
+# MOTOR
+# =========================================================
+class GridSearch:
+    """
+    Búsqueda sobre un espacio de parámetros con caché en disco.
+
+    Args:
+        instances: Instancias GCSP con nombre.
+        space: {parámetro: [valores]} (nombres cortos de PARAM_ALIASES o kwargs del algoritmo).
+        seeds: Semillas por celda (equivale a los arranques de multi_start_solver).
+        base_params: Parámetros fijos que se añaden a todas las configuraciones.
+        workers: Procesos del Pool (1 = en el proceso actual).
+        cache_path: Archivo .jsonl de resultados/caché (None = sin caché en disco).
+        algorithm_func: Algoritmo de mejora (por defecto variable_neighborhood_search).
+    """
+
+    def __init__(self, instances, space: Dict[str, Sequence], seeds: Sequence[int] = (0, 1, 2),
+                 base_params: Optional[dict] = None, workers: int = 1, cache_path: Optional[str] = None,
+                 algorithm_func: Callable = variable_neighborhood_search):
+        self.instances = list(instances)
+        self.configs = [dict(base_params or {}, **c) for c in expand_grid(space)]
+        self.config_ids = [config_hash(c) for c in self.configs]
+        self.seeds = list(seeds)
+        self.workers = max(1, workers or 1)
+        self.cache_path = cache_path
+        self.algorithm_func = algorithm_func
+        self.fingerprints = [instance_fingerprint(inst) for inst in self.instances]
+
+        # (config_id, huella de instancia, semilla) -> makespan
+        self.results: Dict[Tuple[str, str, int], float] = {}
+        self.cache_hits = 0
+        if cache_path:
+            for record in read_results(cache_path):
+                if record.get('source') == 'grid' and 'instance_hash' in record and record.get('makespan') is not None:
+                    key = (record['config'], record['instance_hash'], record['seed'])
+                    self.results[key] = record['makespan']
+
+    def _key(self, c: int, i: int, seed: int) -> Tuple[str, str, int]:
+        return self.config_ids[c], self.fingerprints[i], seed
+
+    def evaluate(self, config_indices: Sequence[int], instance_indices: Sequence[int], pool=None) -> int:
+        """Resuelve las celdas que falten para esas configuraciones e instancias.
+
+        Returns:
+            Número de celdas ejecutadas (las que ya estaban en caché no cuentan).
+        """
+        jobs = []
+        for c in config_indices:
+            for i in instance_indices:
+                for seed in self.seeds:
+                    key = self._key(c, i, seed)
+                    if key in self.results:
+                        self.cache_hits += 1
+                    else:
+                        jobs.append((key, self.configs[c], i, seed))
+        if not jobs:
+            return 0
+
+        by_key = {job[0]: job for job in jobs}
+        sink = ResultSink(self.cache_path) if self.cache_path else None
+        try:
+            if pool is None:
+                _init_worker(self.instances, self.algorithm_func)
+                outputs = map(_run_job, jobs)
+            else:
+                outputs = pool.imap_unordered(_run_job, jobs)
+            for key, makespan, elapsed in outputs:
+                self.results[key] = makespan
+                if sink is not None:
+                    _, config, i, seed = by_key[key]
+                    sink.write(make_record('grid', self.instances[i].name, STATUS_OK, makespan, elapsed,
+                                           config=key[0], params=config, seed=seed, instance_hash=key[1]))
+        finally:
+            if sink is not None:
+                sink.close()
+        return len(jobs)
+
+    def score(self, c: int, instance_indices: Sequence[int]) -> float:
+        """Makespan relativo medio: makespan / mejor makespan conocido en cada instancia.
+
+        Normalizar por instancia evita que las instancias grandes dominen la media.
+        """
+        best = {}
+        for (cid, fp, seed), makespan in self.results.items():
+            if makespan < best.get(fp, float('inf')):
+                best[fp] = makespan
+        ratios = [self.results[self._key(c, i, seed)] / best[self.fingerprints[i]]
+                  for i in instance_indices for seed in self.seeds]
+        return sum(ratios) / len(ratios)
+
+    def mean_makespan(self, c: int, instance_indices: Sequence[int]) -> float:
+        values = [self.results[self._key(c, i, seed)] for i in instance_indices for seed in self.seeds]
+        return sum(values) / len(values)
+
+    def run(self, halving: bool = False, eta: int = 2, min_instances: int = 2,
+            order_seed: int = 0, verbose: bool = True) -> List[dict]:
+        """Ejecuta la búsqueda.
+
+        Args:
+            halving: Si es True, usa successive halving; si no, la rejilla completa.
+            eta: Factor de descarte y de crecimiento de instancias por ronda.
+            min_instances: Instancias de la primera ronda de halving.
+            order_seed: Semilla del orden (aleatorio) en que se añaden las instancias.
+            verbose: Imprime el progreso por ronda.
+
+        Returns:
+            Lista de {'config', 'score', 'mean_makespan', 'instances'} de las
+            configuraciones supervivientes, de mejor a peor.
+        """
+        order = list(range(len(self.instances)))
+        random.Random(order_seed).shuffle(order)
+        survivors = list(range(len(self.configs)))
+        n_inst = min(len(order), max(1, min_instances)) if halving else len(order)
+
+        pool = None
+        if self.workers > 1:
+            pool = multiprocessing.Pool(self.workers, initializer=_init_worker,
+                                        initargs=(self.instances, self.algorithm_func))
+        try:
+            round_no = 0
+            while True:
+                round_no += 1
+                start = time.time()
+                subset = order[:n_inst]
+                executed = self.evaluate(survivors, subset, pool)
+                survivors.sort(key=lambda c: self.score(c, subset))
+                if verbose:
+                    best = self.configs[survivors[0]]
+                    print(f"[Ronda {round_no}] {len(survivors)} configs x {n_inst} instancias x "
+                          f"{len(self.seeds)} semillas | {executed} celdas nuevas | "
+                          f"{time.time() - start:.1f}s | mejor: {best}")
+                if not halving or n_inst == len(order):
+                    break
+                survivors = survivors[:max(1, math.ceil(len(survivors) / eta))]
+                # Con un único superviviente se evalúa directamente sobre todas las instancias
+                n_inst = len(order) if len(survivors) == 1 else min(len(order), n_inst * eta)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        subset = order[:n_inst]
+        return [{'config': self.configs[c], 'score': self.score(c, subset),
+                 'mean_makespan': self.mean_makespan(c, subset), 'instances': n_inst}
+                for c in survivors]
+
+
+def run_grid_search_cli(size: str, instances, space: Dict[str, Sequence], base_params: dict,
+                        seeds: Sequence[int] = (0, 1, 2)) -> List[dict]:
+    """Punto de entrada común de los scripts grid_search_results/grid_search_<size>_instance.py.
+
+    Lee de la línea de comandos --workers, --halving, --eta, --min_instances y
+    --cache, ejecuta la búsqueda e imprime el resumen final.
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description=f"Grid search de hiperparámetros ({size.upper()})")
+    parser.add_argument('--workers', type=int, default=1, help="Procesos del Pool")
+    parser.add_argument('--halving', action='store_true', help="Successive halving en lugar de la rejilla completa")
+    parser.add_argument('--eta', type=int, default=2, help="Factor de descarte del halving")
+    parser.add_argument('--min_instances', type=int, default=2, help="Instancias de la primera ronda del halving")
+    parser.add_argument('--cache', type=str, default=f"grid_search_{size}.jsonl", help="Caché de celdas en disco")
+    args = parser.parse_args()
+
+    search = GridSearch(instances, space, seeds=seeds, base_params=base_params,
+                        workers=args.workers, cache_path=args.cache)
+    print(f"\n--- INICIANDO GRID SEARCH ({len(search.configs)} combinaciones, "
+          f"{len(search.instances)} instancias, {len(search.seeds)} semillas, {search.workers} procesos) ---")
+    ranking = search.run(halving=args.halving, eta=args.eta, min_instances=args.min_instances)
+
+    best = ranking[0]
+    print("\n" + "=" * 40)
+    print("GRID SEARCH FINALIZADO")
+    print("Mejor Configuración Encontrada:")
+    for name in space:
+        print(f"  - {name}: {best['config'][name]}")
+    print(f"  - Makespan Promedio: {best['mean_makespan']:.2f} ({best['instances']} instancias)")
+    print(f"  - Celdas reutilizadas de la caché: {search.cache_hits}")
+    print("=" * 40)
+    return ranking
@@ -1,5 +1,10 @@
+import glob
 import json
+import mmap
 import os
+import struct
+import sys
+from array import array
 from src.problem import Task, Crane, GCSP_Instance
 
 def save_instance_to_json(instance, folder="instances"):
@@ -36,4 +41,170 @@ def load_instance_from_json(filepath):
     
     inst = GCSP_Instance(tasks, cranes)
     inst.name = data['name']
-    return inst
\ No newline at end of file
+    return inst
+
+# =========================================================
+# FORMATO BINARIO EMPAQUETADO (muchas instancias en un archivo)
+# =========================================================
+# Disposición (little-endian):
+#   Cabecera  : magic(8s) versión(u32) nº instancias(u32) offset índice(u64) offset nombres(u64)
+#   Datos     : por instancia, n registros de tarea (id, location, p_0) y
+#               m registros de grúa (id, location), todos int32
+#   Índice    : por instancia, offset datos(u64) n(u32) m(u32) s(i32) t_0(i32)
+#               offset nombre(u32) longitud nombre(u32), relativos al bloque de nombres
+#   Nombres   : nombres en UTF-8 concatenados
+PACK_MAGIC = b'GCSPPACK'
+PACK_VERSION = 1
+PACK_EXTENSION = '.gcsp'
+_PACK_HEADER = struct.Struct('<8sIIQQ')
+_PACK_ENTRY = struct.Struct('<QIIiiII')
+_TASK_FIELDS = 3
+_CRANE_FIELDS = 2
+
+
+def _int32_records(values):
+    """Empaqueta enteros como int32 little-endian (OverflowError si no caben)."""
+    records = array('i', values)
+    if sys.byteorder == 'big':
+        records.byteswap()
+    return records.tobytes()
+
+
+def save_instances_to_pack(instances, filepath):
+    """Guarda una colección de instancias en un único archivo binario empaquetado.
+
+    Args:
+        instances: Iterable de GCSP_Instance (con nombre único cada una).
+        filepath: Ruta del archivo de salida (por convención con extensión .gcsp).
+
+    Returns:
+        Número de instancias escritas.
+    """
+    folder = os.path.dirname(filepath)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+
+    entries = []
+    names = bytearray()
+    seen = set()
+    with open(filepath, 'wb') as f:
+        f.write(b'\0' * _PACK_HEADER.size) # Se reescribe al final
+        for inst in instances:
+            if inst.name in seen:
+                raise ValueError(f"Nombre de instancia duplicado en el paquete: {inst.name}")
+            seen.add(inst.name)
+            for label, value in (('s', inst.s), ('t_0', inst.t_0)):
+                if value != int(value):
+                    raise ValueError(f"{inst.name}: {label}={value} no es entero, el formato usa int32")
+
+            offset = f.tell()
+            f.write(_int32_records(v for t in inst.tasks for v in (t.id, t.location, t.p_0)))
+            f.write(_int32_records(v for c in inst.cranes for v in (c.id, c.location)))
+
+            encoded = inst.name.encode('utf-8')
+            entries.append((offset, len(inst.tasks), len(inst.cranes),
+                            int(inst.s), int(inst.t_0), len(names), len(encoded)))
+            names += encoded
+
+        index_offset = f.tell()
+        for entry in entries:
+            f.write(_PACK_ENTRY.pack(*entry))
+        names_offset = f.tell()
+        f.write(names)
+
+        f.seek(0)
+        f.write(_PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, len(entries), index_offset, names_offset))
+    return len(entries)
+
+
+def convert_json_folder_to_pack(folder, filepath, pattern="*.json"):
+    """Importa todos los JSON de 'folder' (ordenados por nombre) a un archivo empaquetado."""
+    files = sorted(glob.glob(os.path.join(folder, pattern)))
+    return save_instances_to_pack((load_instance_from_json(p) for p in files), filepath)
+
+
+class PackedInstances:
+    """
+    Lector de un archivo empaquetado mediante mmap. Al abrir solo se lee el
+    índice; cada instancia se construye bajo demanda al acceder a ella:
+        pack[3], pack['large_70x5_1'], pack[10:20], for inst in pack: ...
+    Las instancias devueltas son objetos independientes del mapa, así que siguen
+    siendo válidas tras close(). Admite 'with' para cerrar el archivo.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self._file = open(filepath, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # mmap no admite archivos vacíos
+            self._file.close()
+            raise ValueError(f"{filepath}: no es un archivo de instancias empaquetado")
+
+        if len(self._map) < _PACK_HEADER.size:
+            self.close()
+            raise ValueError(f"{filepath}: no es un archivo de instancias empaquetado")
+        magic, version, count, index_offset, names_offset = _PACK_HEADER.unpack_from(self._map, 0)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            self.close()
+            raise ValueError(f"{filepath}: formato o versión de paquete no soportados")
+
+        self._entries = list(_PACK_ENTRY.iter_unpack(
+            self._map[index_offset:index_offset + count * _PACK_ENTRY.size]))
+        self._names_offset = names_offset
+        self.names = [self._name(e) for e in self._entries]
+        self._position = {name: i for i, name in enumerate(self.names)}
+
+    def _name(self, entry):
+        start = self._names_offset + entry[5]
+        return self._map[start:start + entry[6]].decode('utf-8')
+
+    def _build(self, i):
+        offset, n, m, s, t_0, _, _ = self._entries[i]
+        size = (n * _TASK_FIELDS + m * _CRANE_FIELDS) * 4
+        records = array('i')
+        records.frombytes(self._map[offset:offset + size])
+        if sys.byteorder == 'big':
+            records.byteswap()
+        values = records.tolist()
+
+        split = n * _TASK_FIELDS
+        tasks = [Task(*values[k:k + _TASK_FIELDS]) for k in range(0, split, _TASK_FIELDS)]
+        cranes = [Crane(*values[k:k + _CRANE_FIELDS]) for k in range(split, len(values), _CRANE_FIELDS)]
+        return GCSP_Instance(tasks, cranes, s, t_0, name=self.names[i])
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, name):
+        return name in self._position
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key not in self._position:
+                raise KeyError(key)
+            return self._build(self._position[key])
+        if isinstance(key, slice):
+            return [self._build(i) for i in range(*key.indices(len(self)))]
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("índice de instancia fuera de rango")
+        return self._build(key)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._build(i)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,7 +1,10 @@
 import random
+from array import array
 
 # Clase tarea
 class Task:
+    __slots__ = ('id', 'location', 'p_0') # Sin __dict__: menos memoria por tarea
+
     def __init__(self, task_id, location, base_processing_time):
         self.id = task_id
         self.location = location  # l_i en el paper
@@ -12,6 +15,8 @@ class Task:
 
 # Clase grua
 class Crane: 
+    __slots__ = ('id', 'location', 'available_time')
+
     def __init__(self, crane_id, initial_location):
         self.id = crane_id
         self.location = initial_location # l_k^0 en el paper
@@ -20,13 +25,68 @@ class Crane:
     def __repr__(self):
         return f"C{self.id}(StartLoc:{self.location})"
 
+# Vista compacta (structure-of-arrays) de una instancia
+class InstanceArrays:
+    """
+    Vista inmutable de una instancia como arrays de enteros (memoryview de solo
+    lectura sobre array('q')), pensada para los bucles internos de evaluadores y
+    constructores. Exporta el protocolo buffer, así que np.asarray() la convierte
+    sin copia en un array NumPy de solo lectura.
+    Por posición en instance.tasks / instance.cranes:
+        ids, locations, p_0, crane_ids, crane_locations
+    Indexados por id de tarea (0 en los ids que no existen):
+        loc_by_id, p0_by_id
+    """
+    __slots__ = ('ids', 'locations', 'p_0', 'loc_by_id', 'p0_by_id', 'crane_ids', 'crane_locations')
+
+    def __init__(self, tasks, cranes):
+        def frozen(values):
+            return memoryview(array('q', values)).toreadonly()
+
+        max_id = max(t.id for t in tasks)
+        loc_by_id = [0] * (max_id + 1)
+        p0_by_id = [0] * (max_id + 1)
+        for t in tasks:
+            loc_by_id[t.id] = t.location
+            p0_by_id[t.id] = t.p_0
+
+        self.ids = frozen(t.id for t in tasks)
+        self.locations = frozen(t.location for t in tasks)
+        self.p_0 = frozen(t.p_0 for t in tasks)
+        self.loc_by_id = frozen(loc_by_id)
+        self.p0_by_id = frozen(p0_by_id)
+        self.crane_ids = frozen(c.id for c in cranes)
+        self.crane_locations = frozen(c.location for c in cranes)
+
 # Clase instancia
 class GCSP_Instance:
-    def __init__(self, tasks, cranes, safety_margin=1, travel_speed=1):
+    __slots__ = ('tasks', 'cranes', 's', 't_0', 'name', '_arrays', '_evaluator')
+
+    def __init__(self, tasks, cranes, safety_margin=1, travel_speed=1, name=None):
         self.tasks = tasks     # Lista de objetos Task
         self.cranes = cranes   # Lista de objetos Crane
         self.s = safety_margin # s en el paper
         self.t_0 = travel_speed # t^0 en el paper
+        self.name = name
+        self._arrays = None    # Vista InstanceArrays (se crea al primer uso)
+        self._evaluator = None # Evaluador compilado (ver src/evaluator.py)
+
+    @property
+    def arrays(self):
+        """Vista structure-of-arrays (InstanceArrays) de las tareas y grúas."""
+        if self._arrays is None:
+            self._arrays = InstanceArrays(self.tasks, self.cranes)
+        return self._arrays
+
+    # Las cachés (vista y evaluador) no se serializan: se reconstruyen en el
+    # proceso destino al primer uso (las memoryview no son picklables)
+    def __getstate__(self):
+        return (self.tasks, self.cranes, self.s, self.t_0, self.name)
+
+    def __setstate__(self, state):
+        self.tasks, self.cranes, self.s, self.t_0, self.name = state
+        self._arrays = None
+        self._evaluator = None
 
 
 # --- Función Auxiliar para posicionar grúas equidistantes ---
@@ -0,0 +1,92 @@
+"""
+Instrumentación opcional del solver (contadores y tiempos por fase).
+
+Se activa pasando profile=SolverProfile() a multi_start_solver (o
+directamente a variable_neighborhood_search / tabu_search). Sin 'profile'
+los bucles solo comprueban una variable local booleana, así que el coste
+desactivado es despreciable y puede quedarse en las ejecuciones de producción.
+
+Fases (segundos acumulados):
+    construction : GRASP / población aleatoria de cada arranque
+    improvement  : VNS + Tabu de cada arranque
+    neighbors    : generación de vecinos en el Tabu
+    evaluation   : evaluación del makespan de los vecinos
+    bookkeeping  : criterios tabú/aspiración, movimiento y memoria tabú
+Las tres últimas son subfases de 'improvement'. En las métricas derivadas,
+'share' expresa cada fase como fracción de su fase padre (PHASE_TREE).
+
+Contadores:
+    restarts, tabu_runs, iterations, evaluations, accepted_moves,
+    tabu_hits (vecinos tabú), aspiration_hits (vecinos tabú aceptados por
+    aspiración), improvements (nuevo mejor del Tabu), memo_hits/memo_misses,
+    y por vecindario del VNS: shakes.<tipo> e improvements.<tipo>.
+"""
+import json
+import os
+from typing import Dict
+
+TOP_PHASES = ('construction', 'improvement')
+# Fases anidadas: None agrupa las de primer nivel
+PHASE_TREE = {
+    None: TOP_PHASES,
+    'improvement': ('neighbors', 'evaluation', 'bookkeeping'),
+}
+
+
+class SolverProfile:
+    """Contadores y tiempos por fase de una o varias ejecuciones del solver."""
+    __slots__ = ('counters', 'phases')
+
+    def __init__(self):
+        self.counters: Dict[str, int] = {}
+        self.phases: Dict[str, float] = {}
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_time(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def merge(self, other: 'SolverProfile') -> None:
+        """Suma a este perfil los contadores y tiempos de otro (p. ej. de un proceso hijo)."""
+        for name, n in other.counters.items():
+            self.count(name, n)
+        for name, seconds in other.phases.items():
+            self.add_time(name, seconds)
+
+    def as_dict(self) -> dict:
+        """Perfil serializable con las métricas derivadas (evaluaciones/s y reparto de tiempo)."""
+        evaluations = self.counters.get('evaluations', 0)
+        derived = {
+            'evals_per_sec': evaluations / self.phases['evaluation'] if self.phases.get('evaluation') else None,
+            'share': {},
+        }
+        # Cada fase como fracción de su fase padre: las de primer nivel sobre
+        # construction + improvement, las del Tabu sobre improvement
+        for parent, children in PHASE_TREE.items():
+            total = (sum(self.phases.get(p, 0.0) for p in TOP_PHASES) if parent is None
+                     else self.phases.get(parent, 0.0))
+            if total:
+                derived['share'].update({name: self.phases[name] / total
+                                         for name in children if name in self.phases})
+        # Tiempo de mejora fuera de las fases del Tabu (VNS, shaking, evaluación inicial)
+        if 'improvement' in self.phases:
+            derived['other_improvement'] = self.phases['improvement'] - sum(
+                self.phases.get(p, 0.0) for p in PHASE_TREE['improvement'])
+        return {'counters': dict(sorted(self.counters.items())),
+                'phases': dict(sorted(self.phases.items())),
+                'derived': derived}
+
+    def dump(self, path: str, **meta) -> None:
+        """Escribe el perfil (más los campos de 'meta', p. ej. la instancia) en un JSON."""
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(dict(meta, **self.as_dict()), f, indent=2, ensure_ascii=False)
+
+
+def profile_path(folder: str, instance_name: str) -> str:
+    """Ruta del perfil de una instancia dentro de 'folder'."""
+    return os.path.join(folder, f"{instance_name}.json")
+
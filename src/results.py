@@ -0,0 +1,202 @@
+"""
+Registro estructurado de resultados (JSON Lines).
+
+Todos los ejecutores (main.py, exact_solver.py, grid search) escriben un
+registro por instancia resuelta en un archivo .jsonl de solo anexado, con
+flush tras cada registro: si el proceso muere, como mucho se pierde la línea
+que se estaba escribiendo. Los agregadores leen el archivo en una sola pasada.
+
+Campos comunes de un registro:
+    source    : 'metaheuristic' | 'exact' | 'grid'
+    instance  : nombre de la instancia
+    status    : 'OK' | 'TIMEOUT' | 'ERROR' (metaheurística) o el estado de CP-SAT
+    makespan  : float o None si no hay solución
+    time      : segundos
+    lb        : cota inferior (o None)
+    gap       : % sobre la cota (o None)
+    config    : huella de la configuración (config_hash), usada para reanudar
+Cada ejecutor puede añadir campos propios (p. ej. 'method' o 'params').
+"""
+import hashlib
+import json
+import os
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+STATUS_OK = 'OK'
+STATUS_TIMEOUT = 'TIMEOUT'
+STATUS_ERROR = 'ERROR'
+
+
+def make_record(source: str, instance: str, status: str, makespan: Optional[float] = None,
+                time: Optional[float] = None, lb: Optional[float] = None,
+                gap: Optional[float] = None, **extra) -> dict:
+    """Construye un registro con los campos comunes más los campos extra dados."""
+    record = {
+        'source': source,
+        'instance': instance,
+        'status': status,
+        'makespan': makespan,
+        'time': time,
+        'lb': lb,
+        'gap': gap,
+    }
+    record.update(extra)
+    return record
+
+
+def gap_percent(makespan: Optional[float], lb: Optional[float]) -> Optional[float]:
+    """GAP (%) del makespan respecto a la cota inferior, como en las tablas de resultados."""
+    if makespan is None or lb is None:
+        return None
+    if lb > 0:
+        return (makespan - lb) / lb * 100
+    return 0.0
+
+
+class ResultSink:
+    """
+    Escritor de registros en un archivo JSON Lines de solo anexado.
+    Se usa como context manager; cada write() hace flush (y fsync si se pide).
+    """
+
+    def __init__(self, path: str, fsync: bool = False):
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        self.path = path
+        self.fsync = fsync
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def write(self, record: dict) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_results(path: str) -> Iterator[dict]:
+    """Lee un archivo de resultados registro a registro.
+
+    Una línea que no es JSON válido (la última, si el proceso murió a mitad de
+    escritura) se descarta en lugar de abortar la lectura.
+
+    Args:
+        path: Ruta del archivo .jsonl.
+
+    Yields:
+        Cada registro como diccionario, en orden de escritura.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def config_hash(config: dict) -> str:
+    """Huella corta y estable de una configuración (independiente del orden de las claves)."""
+    canonical = json.dumps(config, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:12]
+
+
+def completed_instances(path: str, config_id: str) -> set:
+    """Instancias que ya tienen resultado para la configuración 'config_id'.
+
+    Los registros con estado ERROR no cuentan como hechos: al reanudar se
+    vuelven a intentar. Un TIMEOUT sí es un resultado válido de la configuración.
+    Un mismo archivo puede guardar así varias configuraciones; los resúmenes
+    (summarize_by_combination, generate_all_csvs.py --config) las separan por
+    este campo.
+    """
+    return {r['instance'] for r in read_results(path)
+            if r.get('config') == config_id and r.get('status') != STATUS_ERROR}
+
+
+def combination_of(instance_name: str) -> Optional[str]:
+    """Extrae la combinación 'NxM' del nombre ('large_30x3_1' o 'Large_T30_C3' -> '30x3')."""
+    match = re.search(r'(\d+)x(\d+)', instance_name)
+    if match is None:
+        match = re.search(r'T(\d+)_C(\d+)', instance_name)
+    if match is None:
+        return None
+    return f"{match.group(1)}x{match.group(2)}"
+
+
+def _hashable(value):
+    """Convierte un campo de agrupación (p. ej. el dict 'params') en un valor hashable."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashable(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return tuple(_hashable(v) for v in value)
+    return value
+
+
+def summarize_by_combination(records: Iterable[dict],
+                             group_fields: Tuple[str, ...] = ('source', 'method', 'config')
+                             ) -> Dict[Tuple, Dict[str, dict]]:
+    """Medias de makespan, tiempo y GAP por grupo y combinación NxM, en una pasada.
+
+    Si una misma instancia aparece varias veces en un grupo (re-ejecución), solo
+    cuenta el último registro. La configuración forma parte del grupo: un mismo
+    archivo acumula ejecuciones de varias configuraciones (--resume) y sus
+    registros nunca se mezclan en una media. Los registros sin makespan
+    (TIMEOUT/ERROR) no entran en las medias, pero sí en el recuento 'failed'.
+
+    Args:
+        records: Registros, por ejemplo read_results(path).
+        group_fields: Campos que identifican un grupo (los ausentes valen None).
+
+    Returns:
+        {grupo: {combinación: {'n', 'failed', 'makespan', 'time', 'gap'}}}; 'gap'
+        es None si ningún registro del grupo tenía GAP.
+    """
+    latest = {}
+    for record in records:
+        group = tuple(_hashable(record.get(field)) for field in group_fields)
+        latest[group, record['instance']] = record
+
+    sums = defaultdict(lambda: defaultdict(lambda: {'n': 0, 'failed': 0, 'makespan': 0.0,
+                                                    'time': 0.0, 'gap': 0.0, 'n_gap': 0}))
+    for (group, instance), record in latest.items():
+        comb = combination_of(instance)
+        acc = sums[group][comb]
+        if record.get('makespan') is None:
+            acc['failed'] += 1
+            continue
+        acc['n'] += 1
+        acc['makespan'] += record['makespan']
+        acc['time'] += record.get('time') or 0.0
+        if record.get('gap') is not None:
+            acc['gap'] += record['gap']
+            acc['n_gap'] += 1
+
+    summary = {}
+    for group, combs in sums.items():
+        summary[group] = {}
+        for comb, acc in combs.items():
+            n = acc['n']
+            summary[group][comb] = {
+                'n': n,
+                'failed': acc['failed'],
+                'makespan': acc['makespan'] / n if n else None,
+                'time': acc['time'] / n if n else None,
+                'gap': acc['gap'] / acc['n_gap'] if acc['n_gap'] else None,
+            }
+    return summary
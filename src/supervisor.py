@@ -0,0 +1,274 @@
+"""
+Supervisor de trabajos con límite de tiempo real sobre procesos reutilizables.
+
+Sustituye a signal.alarm (que en Windows no existe, no funciona fuera del
+hilo principal e interrumpe a mitad de una iteración) y a lanzar un proceso
+nuevo por instancia. Un WorkerPool mantiene N procesos de larga vida, cada
+uno conectado al supervisor por un Pipe:
+
+- El supervisor envía un trabajo (función a nivel de módulo + argumentos) a
+  un proceso libre y anota su plazo.
+- La función recibe un callable 'report' y puede enviar por el Pipe su
+  progreso (p. ej. el mejor makespan hasta el momento) cuando quiera.
+- Si el trabajo supera el plazo, el supervisor vacía el Pipe (para quedarse
+  con el último progreso enviado), termina el proceso y arranca otro en su
+  lugar. Los procesos que terminan a tiempo se reutilizan sin coste de
+  arranque ni de imports.
+- Cada proceso del pool es líder de su propio grupo de procesos (POSIX). Al
+  terminarlo se envía la señal a todo el grupo, de modo que los procesos que
+  haya lanzado el trabajo (p. ej. el Pool de multi_start_solver con
+  workers > 1) no sobreviven al corte. En Windows solo se termina el proceso.
+  Como los grupos quedan fuera del de la terminal, un Ctrl-C solo llega al
+  supervisor, que los cierra al salir del 'with'.
+
+Cada trabajo termina con un diccionario de resultado:
+    key      : clave del trabajo
+    status   : 'done' | 'timeout' | 'error'
+    result   : valor devuelto por la función (None si no terminó)
+    progress : último valor enviado con report() (o None)
+    elapsed  : segundos desde que se asignó el trabajo
+    error    : mensaje de la excepción (solo con 'error')
+"""
+import multiprocessing
+import os
+import signal
+import time
+from collections import deque
+from multiprocessing.connection import wait
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+JOB_DONE = 'done'
+JOB_TIMEOUT = 'timeout'
+JOB_ERROR = 'error'
+
+KILL_GRACE = 5 # Segundos entre terminate() y kill()
+
+
+def _worker_main(conn) -> None:
+    """Bucle de un proceso del pool: recibe (id, función, args) y responde por el Pipe.
+
+    Un mensaje None (o el cierre del Pipe) termina el proceso.
+    """
+    _new_process_group(0)
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+        job_id, func, args = message
+
+        def report(value, job_id=job_id):
+            conn.send(('progress', job_id, value))
+
+        try:
+            result = func(*args, report=report)
+            conn.send((JOB_DONE, job_id, result))
+        except Exception as exc:
+            conn.send((JOB_ERROR, job_id, f"{type(exc).__name__}: {exc}"))
+
+
+def _new_process_group(pid: int) -> None:
+    """Convierte el proceso 'pid' (0 = el actual) en líder de un grupo propio.
+
+    Lo hacen tanto el hijo al arrancar como el padre tras start(), para que el
+    grupo exista aunque el corte llegue antes de que el hijo ejecute nada.
+    """
+    if not hasattr(os, 'setpgid'):
+        return
+    try:
+        os.setpgid(pid, 0)
+    except OSError:
+        # El hijo ya lo hizo (o ya terminó)
+        pass
+
+
+def _signal_group(pgid: int, sig: int) -> bool:
+    """Envía 'sig' al grupo 'pgid'. Devuelve False si ya no queda ningún proceso en él."""
+    try:
+        os.killpg(pgid, sig)
+        return True
+    except (ProcessLookupError, PermissionError):
+        return False
+
+
+class _Worker:
+    """Proceso del pool con su extremo del Pipe y el trabajo en curso."""
+    __slots__ = ('process', 'conn', 'pgid', 'job_id', 'key', 'started', 'deadline', 'progress', 'jobs_done')
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        # No daemon: los trabajos pueden abrir sus propios Pool (multi_start_solver con workers > 1)
+        self.process = context.Process(target=_worker_main, args=(child_conn,))
+        self.process.start()
+        child_conn.close()
+        _new_process_group(self.process.pid)
+        self.pgid = self.process.pid if hasattr(os, 'killpg') else None
+        self.job_id = None
+        self.key = None
+        self.started = 0.0
+        self.deadline = None
+        self.progress = None
+        self.jobs_done = 0
+
+    def stop(self, force: bool = False) -> None:
+        """Cierra el proceso: con force lo termina sin esperar a que acabe su trabajo.
+
+        Después se termina lo que quede de su grupo (procesos lanzados por el
+        trabajo), también si el proceso del pool ya había salido por su cuenta.
+        """
+        if not force:
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout=KILL_GRACE)
+        if self.pgid is not None:
+            self._stop_group()
+        elif self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=KILL_GRACE)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+        self.conn.close()
+
+    def _stop_group(self) -> None:
+        """SIGTERM a todo el grupo y, tras esperar al proceso hasta KILL_GRACE, SIGKILL a lo que quede."""
+        if _signal_group(self.pgid, signal.SIGTERM):
+            self.process.join(timeout=KILL_GRACE)
+            _signal_group(self.pgid, signal.SIGKILL)
+        self.process.join()
+
+
+class WorkerPool:
+    """
+    Pool de procesos de larga vida con límite de tiempo por trabajo.
+
+    Args:
+        processes: Número de procesos (trabajos simultáneos).
+        max_jobs_per_worker: Si se indica, cada proceso se recicla tras ese
+            número de trabajos (libera la memoria que haya acumulado).
+        context: Contexto de multiprocessing (por defecto el de la plataforma).
+
+    Uso:
+        with WorkerPool(4) as pool:
+            pool.run([(clave, funcion, args), ...], time_limit=630, on_result=callback)
+    """
+
+    def __init__(self, processes: int = 1, max_jobs_per_worker: Optional[int] = None, context=None):
+        self.context = context or multiprocessing.get_context()
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.workers = [_Worker(self.context) for _ in range(max(1, processes))]
+        self.spawned = len(self.workers)
+        self._next_id = 0
+
+    def _replace(self, worker: _Worker, force: bool) -> _Worker:
+        worker.stop(force=force)
+        new = _Worker(self.context)
+        self.workers[self.workers.index(worker)] = new
+        self.spawned += 1
+        return new
+
+    def _finish(self, worker: _Worker, status: str, result: Any, on_result: Callable, error: str = None) -> None:
+        outcome = {
+            'key': worker.key,
+            'status': status,
+            'result': result,
+            'progress': worker.progress,
+            'elapsed': time.time() - worker.started,
+        }
+        if error is not None:
+            outcome['error'] = error
+        worker.job_id = worker.key = worker.deadline = worker.progress = None
+        worker.jobs_done += 1
+        on_result(outcome)
+
+    def _drain(self, worker: _Worker, on_result: Callable) -> None:
+        """Procesa todos los mensajes pendientes de un proceso."""
+        while worker.job_id is not None and worker.conn.poll():
+            kind, job_id, value = worker.conn.recv()
+            if job_id != worker.job_id:
+                continue
+            if kind == 'progress':
+                worker.progress = value
+            elif kind == JOB_DONE:
+                self._finish(worker, JOB_DONE, value, on_result)
+            else:
+                self._finish(worker, JOB_ERROR, None, on_result, error=value)
+
+    def run(self, jobs: Iterable[Tuple[Any, Callable, tuple]], time_limit: Optional[float],
+            on_result: Callable[[dict], None]) -> None:
+        """Ejecuta los trabajos y entrega cada resultado a 'on_result' en cuanto termina.
+
+        Args:
+            jobs: Tuplas (clave, función, args). La función debe estar definida a
+                nivel de módulo y aceptar el argumento nombrado 'report'.
+            time_limit: Segundos de reloj por trabajo (None = sin límite).
+            on_result: Se llama con el diccionario de resultado de cada trabajo
+                (el orden de llegada no es el de 'jobs').
+        """
+        pending = deque(jobs)
+        while True:
+            for worker in list(self.workers):
+                if worker.job_id is None and pending:
+                    if self.max_jobs_per_worker and worker.jobs_done >= self.max_jobs_per_worker:
+                        worker = self._replace(worker, force=False)
+                    key, func, args = pending.popleft()
+                    self._next_id += 1
+                    worker.job_id, worker.key = self._next_id, key
+                    worker.started = time.time()
+                    worker.deadline = None if time_limit is None else worker.started + time_limit
+                    try:
+                        worker.conn.send((worker.job_id, func, args))
+                    except (BrokenPipeError, OSError):
+                        # El proceso libre había muerto: se sustituye y se reenvía
+                        job_id, started, deadline = worker.job_id, worker.started, worker.deadline
+                        worker = self._replace(worker, force=True)
+                        worker.job_id, worker.key = job_id, key
+                        worker.started, worker.deadline = started, deadline
+                        worker.conn.send((worker.job_id, func, args))
+
+            busy = [w for w in self.workers if w.job_id is not None]
+            if not busy:
+                break
+
+            deadlines = [w.deadline for w in busy if w.deadline is not None]
+            timeout = 0.5 if not deadlines else max(0.0, min(0.5, min(deadlines) - time.time()))
+            ready = wait([w.conn for w in busy], timeout=timeout)
+            for worker in busy:
+                if worker.conn not in ready:
+                    continue
+                try:
+                    self._drain(worker, on_result)
+                except (EOFError, OSError):
+                    # El proceso murió sin responder (p. ej. por falta de memoria)
+                    self._finish(worker, JOB_ERROR, None, on_result,
+                                 error=f"worker exited with code {worker.process.exitcode}")
+                    self._replace(worker, force=True)
+
+            now = time.time()
+            for worker in list(self.workers):
+                if worker.job_id is None or worker.deadline is None or now < worker.deadline:
+                    continue
+                # Último progreso enviado antes del corte
+                try:
+                    self._drain(worker, on_result)
+                except (EOFError, OSError):
+                    pass
+                if worker.job_id is not None:
+                    self._finish(worker, JOB_TIMEOUT, None, on_result)
+                    self._replace(worker, force=True)
+
+    def close(self) -> None:
+        """Cierra todos los procesos (los que sigan ocupados se terminan)."""
+        for worker in self.workers:
+            worker.stop(force=worker.job_id is not None)
+        self.workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
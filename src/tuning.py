@@ -0,0 +1,363 @@
+"""
+Ajuste de parámetros por carreras (racing, al estilo de irace).
+
+Cada carrera evalúa un conjunto de configuraciones instancia a instancia con
+multi_start_solver. A partir de 'first_test' instancias se aplica el test de
+Friedman y, si es significativo, el post-hoc de Conover elimina las
+configuraciones peores que la mejor. Los supervivientes pasan a ser élite y
+la siguiente carrera muestrea nuevos candidatos alrededor de ellos, con una
+dispersión que se reduce carrera a carrera. Todo termina al agotar el
+presupuesto de CPU (segundos de CPU sumados en todos los procesos).
+
+Las distribuciones (chi-cuadrado, t de Student) se calculan aquí mismo con
+las funciones gamma/beta incompletas, sin dependencias externas.
+"""
+import math
+import multiprocessing
+import random
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.algorithms import multi_start_solver, variable_neighborhood_search
+from src.grid_search import algorithm_kwargs
+from src.results import config_hash
+
+
+# =========================================================
+# DISTRIBUCIONES (sin scipy)
+# =========================================================
+def _gamma_q(a: float, x: float) -> float:
+    """Función gamma incompleta regularizada superior Q(a, x)."""
+    if x <= 0:
+        return 1.0
+    log_prefix = -x + a * math.log(x) - math.lgamma(a)
+    if x < a + 1:
+        # Serie para P(a, x)
+        term = total = 1.0 / a
+        ap = a
+        for _ in range(500):
+            ap += 1
+            term *= x / ap
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return 1.0 - total * math.exp(log_prefix)
+    # Fracción continua (Lentz) para Q(a, x)
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 500):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return math.exp(log_prefix) * h
+
+
+def chi2_sf(x: float, df: int) -> float:
+    """P(X > x) para una chi-cuadrado con 'df' grados de libertad."""
+    return _gamma_q(df / 2.0, x / 2.0)
+
+
+def _beta_cf(a: float, b: float, x: float) -> float:
+    """Fracción continua de la beta incompleta (Lentz)."""
+    tiny = 1e-300
+    c = 1.0
+    d = 1 - (a + b) * x / (a + 1)
+    d = 1 / (tiny if abs(d) < tiny else d)
+    h = d
+    for m in range(1, 500):
+        m2 = 2 * m
+        for an in (m * (b - m) * x / ((a + m2 - 1) * (a + m2)),
+                   -(a + m) * (a + b + m) * x / ((a + m2) * (a + m2 + 1))):
+            d = 1 + an * d
+            d = 1 / (tiny if abs(d) < tiny else d)
+            c = 1 + an / c
+            c = tiny if abs(c) < tiny else c
+            h *= d * c
+        if abs(d * c - 1) < 1e-15:
+            break
+    return h
+
+
+def _beta_inc(a: float, b: float, x: float) -> float:
+    """Función beta incompleta regularizada I_x(a, b)."""
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    log_front = (math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                 + a * math.log(x) + b * math.log(1 - x))
+    if x < (a + 1) / (a + b + 2):
+        return math.exp(log_front) * _beta_cf(a, b, x) / a
+    return 1 - math.exp(log_front) * _beta_cf(b, a, 1 - x) / b
+
+
+def t_sf(t: float, df: float) -> float:
+    """P(T > t) para una t de Student con 'df' grados de libertad."""
+    tail = 0.5 * _beta_inc(df / 2.0, 0.5, df / (df + t * t))
+    return tail if t >= 0 else 1 - tail
+
+
+def t_ppf(q: float, df: float) -> float:
+    """Cuantil q de la t de Student (bisección sobre t_sf)."""
+    lo, hi = -1e3, 1e3
+    for _ in range(200):
+        mid = (lo + hi) / 2
+        if 1 - t_sf(mid, df) < q:
+            lo = mid
+        else:
+            hi = mid
+    return (lo + hi) / 2
+
+
+# =========================================================
+# TESTS
+# =========================================================
+def _ranks(row: Sequence[float]) -> List[float]:
+    """Rangos (1 = mejor) con empates promediados."""
+    order = sorted(range(len(row)), key=lambda j: row[j])
+    ranks = [0.0] * len(row)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and row[order[j + 1]] == row[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2 + 1
+        i = j + 1
+    return ranks
+
+
+def friedman_test(matrix: Sequence[Sequence[float]]) -> Tuple[float, float, List[float]]:
+    """Test de Friedman sobre una matriz bloques (instancias) x tratamientos (configuraciones).
+
+    Returns:
+        (estadístico T1 corregido por empates, p-valor, suma de rangos por configuración).
+    """
+    b, k = len(matrix), len(matrix[0])
+    rank_rows = [_ranks(row) for row in matrix]
+    rank_sums = [sum(r[j] for r in rank_rows) for j in range(k)]
+    a_sum = sum(x * x for r in rank_rows for x in r)
+    c_term = b * k * (k + 1) ** 2 / 4
+    if a_sum == c_term: # Todos empatados en todos los bloques
+        return 0.0, 1.0, rank_sums
+    t1 = (k - 1) * sum((r - b * (k + 1) / 2) ** 2 for r in rank_sums) / (a_sum - c_term)
+    return t1, chi2_sf(t1, k - 1), rank_sums
+
+
+def race_survivors(matrix: Sequence[Sequence[float]], alpha: float = 0.05) -> List[int]:
+    """Índices de las configuraciones que no son significativamente peores que la mejor.
+
+    Friedman y, si rechaza, comparaciones múltiples de Conover contra la
+    configuración de menor suma de rangos (el mismo criterio que irace).
+    """
+    b, k = len(matrix), len(matrix[0])
+    t1, p_value, rank_sums = friedman_test(matrix)
+    if k < 2 or p_value >= alpha:
+        return list(range(k))
+
+    rank_rows = [_ranks(row) for row in matrix]
+    a_sum = sum(x * x for r in rank_rows for x in r)
+    c_term = b * k * (k + 1) ** 2 / 4
+    df = (b - 1) * (k - 1)
+    spread = math.sqrt(max(0.0, 2 * b * (1 - t1 / (b * (k - 1))) * (a_sum - c_term) / df))
+    critical = t_ppf(1 - alpha / 2, df) * spread
+
+    best = min(rank_sums)
+    return [j for j in range(k) if rank_sums[j] - best <= critical]
+
+
+# =========================================================
+# EVALUACIÓN EN LOS PROCESOS HIJO
+# =========================================================
+_TUNING_INSTANCES = None
+
+
+def _init_tuning_worker(instances):
+    global _TUNING_INSTANCES
+    _TUNING_INSTANCES = instances
+
+
+def _evaluate_job(job):
+    """Evalúa (clave, config, índice de instancia, semilla, arranques). Devuelve (clave, makespan, CPU s)."""
+    key, config, index, seed, n_restarts = job
+    instance = _TUNING_INSTANCES[index]
+    cpu_start = time.process_time()
+    _, avg_makespan, _ = multi_start_solver(instance, variable_neighborhood_search,
+                                            n_restarts=n_restarts, seed=seed,
+                                            **algorithm_kwargs(config, instance))
+    return key, avg_makespan, time.process_time() - cpu_start
+
+
+# =========================================================
+# TUNER
+# =========================================================
+class RacingTuner:
+    """
+    Tuner por carreras sobre un espacio discreto {parámetro: [valores ordenados]}.
+
+    Args:
+        instances: Instancias de ajuste.
+        space: Valores posibles de cada parámetro (nombres de src.grid_search.PARAM_ALIASES
+            o kwargs del algoritmo). El orden de la lista define la vecindad al muestrear.
+        budget_cpu: Presupuesto total en segundos de CPU.
+        base_params: Parámetros fijos para todas las configuraciones.
+        n_restarts: Arranques de multi_start_solver por evaluación.
+        workers: Procesos que evalúan en paralelo las configuraciones vivas.
+        n_candidates: Configuraciones por carrera (élite incluida).
+        n_elites: Máximo de supervivientes que pasan a la carrera siguiente.
+        first_test: Instancias antes del primer test estadístico.
+        alpha: Nivel de significación.
+        max_blocks: Instancias como máximo por carrera (None = todas).
+        seed: Semilla del muestreo y del orden de instancias.
+    """
+
+    def __init__(self, instances, space: Dict[str, Sequence], budget_cpu: float,
+                 base_params: Optional[dict] = None, n_restarts: int = 1, workers: int = 1,
+                 n_candidates: int = 10, n_elites: int = 3, first_test: int = 5,
+                 alpha: float = 0.05, max_blocks: Optional[int] = None, seed: int = 0):
+        self.instances = list(instances)
+        self.space = {k: list(v) for k, v in space.items()}
+        self.budget_cpu = budget_cpu
+        self.base_params = dict(base_params or {})
+        self.n_restarts = n_restarts
+        self.workers = max(1, workers or 1)
+        self.n_candidates = n_candidates
+        self.n_elites = n_elites
+        self.first_test = max(2, first_test)
+        self.alpha = alpha
+        self.max_blocks = max_blocks or len(self.instances)
+        self.rng = random.Random(seed)
+
+        self.order = list(range(len(self.instances)))
+        self.rng.shuffle(self.order)
+        self.used_cpu = 0.0
+        self.evaluations = 0
+        # (config_id, bloque) -> makespan medio; un bloque es (instancia, semilla)
+        self.results: Dict[Tuple[str, int], float] = {}
+        self.configs: Dict[str, dict] = {}
+
+    # --- Muestreo ---
+    def _block(self, t: int) -> Tuple[int, int]:
+        """Bloque t del flujo: recorre las instancias y, al agotarlas, cambia de semilla."""
+        return self.order[t % len(self.order)], 1000 * (t // len(self.order))
+
+    def _register(self, params: dict) -> str:
+        config = dict(self.base_params, **params)
+        cid = config_hash(config)
+        self.configs[cid] = config
+        return cid
+
+    def _sample_uniform(self) -> dict:
+        return {k: self.rng.choice(v) for k, v in self.space.items()}
+
+    def _sample_around(self, parent: dict, race_no: int) -> dict:
+        """Perturba cada parámetro con probabilidad 1/2 alrededor del valor del padre.
+
+        El salto sigue una normal (en índices de la lista de valores) cuya
+        desviación se reduce a la mitad en cada carrera.
+        """
+        child = {}
+        for name, values in self.space.items():
+            index = values.index(parent[name])
+            if self.rng.random() < 0.5:
+                sigma = max(0.5, len(values) * 0.5 ** race_no)
+                index = min(len(values) - 1, max(0, round(self.rng.gauss(index, sigma))))
+            child[name] = values[index]
+        return child
+
+    def _new_candidates(self, elites: List[str], race_no: int) -> List[str]:
+        alive = list(elites)
+        attempts = 0
+        while len(alive) < self.n_candidates and attempts < 50 * self.n_candidates:
+            attempts += 1
+            if elites:
+                # Padres ponderados por su posición en la élite (el mejor, más probable)
+                weights = [len(elites) - i for i in range(len(elites))]
+                parent = self.configs[self.rng.choices(elites, weights)[0]]
+                params = self._sample_around({k: parent[k] for k in self.space}, race_no)
+            else:
+                params = self._sample_uniform()
+            cid = self._register(params)
+            if cid not in alive:
+                alive.append(cid)
+        return alive
+
+    # --- Evaluación ---
+    def _evaluate_block(self, alive: List[str], t: int, pool) -> None:
+        index, seed = self._block(t)
+        jobs = [((cid, t), self.configs[cid], index, seed, self.n_restarts)
+                for cid in alive if (cid, t) not in self.results]
+        if pool is None:
+            _init_tuning_worker(self.instances)
+            outputs = map(_evaluate_job, jobs)
+        else:
+            outputs = pool.imap_unordered(_evaluate_job, jobs)
+        for key, makespan, cpu in outputs:
+            self.results[key] = makespan
+            self.used_cpu += cpu
+            self.evaluations += 1
+
+    def _race(self, alive: List[str], pool, race_no: int, verbose: bool) -> List[str]:
+        t = 0
+        while t < self.max_blocks and self.used_cpu < self.budget_cpu:
+            self._evaluate_block(alive, t, pool)
+            t += 1
+            if t >= self.first_test and len(alive) > 1:
+                matrix = [[self.results[cid, b] for cid in alive] for b in range(t)]
+                alive = [alive[j] for j in race_survivors(matrix, self.alpha)]
+            if len(alive) <= 1:
+                break
+
+        # Orden final por rango medio en los bloques evaluados
+        matrix = [[self.results[cid, b] for cid in alive] for b in range(t)]
+        _, _, rank_sums = friedman_test(matrix) if t else (0, 1, [0] * len(alive))
+        ranked = [cid for _, cid in sorted(zip(rank_sums, alive), key=lambda x: x[0])]
+        if verbose:
+            print(f"[Carrera {race_no}] {t} instancias | {len(alive)} supervivientes | "
+                  f"CPU {self.used_cpu:.0f}/{self.budget_cpu:.0f}s | mejor: "
+                  f"{ {k: self.configs[ranked[0]][k] for k in self.space} }")
+        return ranked[:self.n_elites]
+
+    def run(self, verbose: bool = True) -> List[dict]:
+        """Encadena carreras hasta agotar el presupuesto de CPU.
+
+        Returns:
+            Élite final, de mejor a peor: {'config', 'mean_makespan', 'instances'}
+            (media sobre los bloques en que se evaluó cada configuración).
+        """
+        pool = None
+        if self.workers > 1:
+            pool = multiprocessing.Pool(self.workers, initializer=_init_tuning_worker,
+                                        initargs=(self.instances,))
+        elites: List[str] = []
+        try:
+            race_no = 0
+            while self.used_cpu < self.budget_cpu:
+                race_no += 1
+                evaluations = self.evaluations
+                alive = self._new_candidates(elites, race_no)
+                elites = self._race(alive, pool, race_no, verbose)
+                if self.evaluations == evaluations:
+                    break # Espacio agotado: ni candidatos nuevos ni bloques por evaluar
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        summary = []
+        for cid in elites:
+            values = [mk for (c, _), mk in self.results.items() if c == cid]
+            summary.append({'config': self.configs[cid], 'mean_makespan': sum(values) / len(values),
+                            'instances': len(values)})
+        return summary
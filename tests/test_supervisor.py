@@ -0,0 +1,73 @@
+"""
+Pruebas del supervisor de trabajos (src/supervisor.py).
+
+Uso (desde la raíz del repositorio):
+    python -m pytest tests
+"""
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from src.supervisor import WorkerPool, JOB_DONE, JOB_TIMEOUT
+
+
+def _spin(_):
+    while True:
+        pass
+
+
+def _pool_job(n_children, report=None):
+    """Trabajo que abre un Pool (como multi_start_solver con workers > 1) y no termina."""
+    pool = multiprocessing.Pool(n_children)
+    pool.map_async(_spin, range(n_children))
+    report([p.pid for p in pool._pool])
+    time.sleep(600)
+
+
+def _square(x, report=None):
+    return x * x
+
+
+def _alive(pid):
+    """¿Sigue vivo 'pid'? Un zombi (ya muerto, pendiente de recoger) cuenta como terminado."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(')', 1)[1].split()[0] not in ('Z', 'X')
+    except FileNotFoundError:
+        return False
+    except OSError:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        return True
+
+
+def test_finished_jobs_reuse_the_worker():
+    outcomes = []
+    with WorkerPool(1) as pool:
+        pid = pool.workers[0].process.pid
+        pool.run([(x, _square, (x,)) for x in range(3)], time_limit=30, on_result=outcomes.append)
+        assert pool.workers[0].process.pid == pid
+    assert [o['status'] for o in outcomes] == [JOB_DONE] * 3
+    assert sorted(o['result'] for o in outcomes) == [0, 1, 4]
+
+
+@pytest.mark.skipif(not hasattr(os, 'killpg'), reason="grupos de procesos solo en POSIX")
+def test_timeout_kills_processes_spawned_by_the_job():
+    outcomes = []
+    with WorkerPool(1) as pool:
+        worker_pid = pool.workers[0].process.pid
+        pool.run([('pool', _pool_job, (2,))], time_limit=2, on_result=outcomes.append)
+        assert pool.workers[0].process.pid != worker_pid
+
+    (outcome,) = outcomes
+    assert outcome['status'] == JOB_TIMEOUT
+    children = outcome['progress']
+    assert len(children) == 2
+    deadline = time.time() + 5
+    while any(_alive(pid) for pid in [worker_pid] + children) and time.time() < deadline:
+        time.sleep(0.1)
+    assert not any(_alive(pid) for pid in [worker_pid] + children)
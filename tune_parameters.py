@@ -0,0 +1,60 @@
+"""
+Ajuste de parámetros de GRASP + VNS/Tabu por carreras (ver src/tuning.py).
+
+Uso (desde la raíz del repositorio):
+    python tune_parameters.py --size large --budget_hours 4 --workers 8
+"""
+import argparse
+import glob
+
+from main import get_sort_key
+from src.io_handler import load_instance_from_json
+from src.tuning import RacingTuner
+
+# Espacio de búsqueda: el orden de cada lista define la vecindad al muestrear
+SEARCH_SPACE = {
+    'tenure': [2, 4, 6, 8, 10, 12, 15, 20, 25, 30],
+    'candidates': [10, 20, 40, 60, 120, 200, 360, 500, 1000],
+    'alpha': [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9],
+    'vns_loops': [3, 5, 10, 15],
+    'init_strategy': ['grasp', 'random'],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Racing tuner (estilo irace) para GCSP")
+    parser.add_argument('--size', type=str, choices=['small', 'medium', 'large'], required=True)
+    parser.add_argument('--budget_hours', type=float, default=1.0, help="Presupuesto en horas de CPU")
+    parser.add_argument('--workers', type=int, default=1, help="Procesos en paralelo")
+    parser.add_argument('--restarts', type=int, default=1, help="Arranques de multi_start_solver por evaluación")
+    parser.add_argument('--candidates_per_race', type=int, default=10)
+    parser.add_argument('--first_test', type=int, default=5, help="Instancias antes del primer test")
+    parser.add_argument('--alpha', type=float, default=0.05, help="Nivel de significación")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    files = sorted(glob.glob(f"instances/{args.size}_*.json"), key=get_sort_key)
+    if not files:
+        print(f"ERROR: No se encontraron instancias '{args.size}'.")
+        return
+    instances = [load_instance_from_json(fp) for fp in files]
+
+    tuner = RacingTuner(instances, SEARCH_SPACE, budget_cpu=args.budget_hours * 3600,
+                        n_restarts=args.restarts, workers=args.workers,
+                        n_candidates=args.candidates_per_race, first_test=args.first_test,
+                        alpha=args.alpha, seed=args.seed)
+    print(f"\n=== RACING | SIZE: {args.size.upper()} | {len(instances)} instancias | "
+          f"CPU: {args.budget_hours:.2f}h | WORKERS: {tuner.workers} ===")
+    elites = tuner.run()
+
+    print("\n" + "=" * 40)
+    print(f"AJUSTE FINALIZADO ({tuner.evaluations} evaluaciones, {tuner.used_cpu:.0f}s de CPU)")
+    for rank, elite in enumerate(elites, 1):
+        params = {k: elite['config'][k] for k in SEARCH_SPACE}
+        print(f"  {rank}. {params} -> makespan medio {elite['mean_makespan']:.2f} "
+              f"({elite['instances']} instancias)")
+    print("=" * 40)
+
+
+if __name__ == "__main__":
+    main()